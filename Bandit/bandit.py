@@ -1,43 +1,227 @@
+import copy
+import threading
+
+import numpy as np
+from bandit.core import instrumentation as instr
 from bandit.core.history_buffer import HistoryBuffer
+from bandit.core.checkpoint import save_checkpoint, load_checkpoint
 from bandit.inference.inferencer import Inferencer
+from bandit.inference.joint_inferencer import JointInferencer
+from bandit.trainer.background_trainer import BackgroundTrainer
 
 class ContextualBandit:
-    def __init__(self, global_provider, arms, model):
+    def __init__(self, global_provider, arms, model, inferencer=None, epsilon=0.0,
+                 propensity_draws=0):
+        """
+        epsilon: epsilon-greedy exploration rate. The probability of the logged
+                 action is stored as "propensity" for off-policy evaluation.
+        propensity_draws: for stochastic models (Thompson sampling) the
+                 probability of the logged action is not known exactly. With
+                 propensity_draws > 0 it is estimated from that many posterior
+                 draws per action; with 0 (default) no propensity is logged
+                 and off-policy evaluation skips those entries.
+        """
         self.global_provider = global_provider
+        self.epsilon = epsilon
+        self.propensity_draws = propensity_draws
         self.arms = arms  # dict
         self.model = model
         self.buffer = HistoryBuffer()
-        self.inferencer = Inferencer(arms, model)
+        # inferencer: pass one built with Inferencer.with_model() to share arm storage
+        self.inferencer = inferencer or Inferencer(arms, model)
+        self.joint = None   # JointInferencer once enable_joint() is called
+        self.trainer = None # BackgroundTrainer once enable_background_training() is called
+        self.lock = threading.RLock()   # serializes model / inferencer swaps (never taken by infer)
+
+    def select_with_propensity(self, G):
+        """
+        Returns (arm_id, probability that this policy picks arm_id for G);
+        the probability is None for a stochastic model without propensity_draws.
+        """
+        return self._explore(self.inferencer.select_arm(G), G=G)
+
+    def _explore(self, greedy, inferencer=None, G=None):
+        """
+        Epsilon-greedy on top of the model's pick → (arm_id, propensity).
+
+        Deterministic models: exact, epsilon / n (+ 1 - epsilon for the greedy arm).
+        Stochastic models: epsilon / n + (1 - epsilon) * P(model picks arm_id),
+        the latter a Monte-Carlo estimate over propensity_draws posterior draws
+        (floored at 1 / propensity_draws); None when propensity_draws is 0.
+        """
+        inferencer = inferencer or self.inferencer
+        arm_ids = inferencer.arm_ids
+        n = len(arm_ids)
+        arm_id = greedy
+        if self.epsilon > 0 and np.random.random() < self.epsilon:
+            arm_id = arm_ids[np.random.randint(n)]
+
+        if getattr(inferencer.model, "stochastic", False):
+            if not self.propensity_draws or G is None:
+                return arm_id, None
+            picks = inferencer.model.pick_probabilities(G, inferencer.arm_matrix, self.propensity_draws)
+            p_model = max(picks[inferencer.arm_index[arm_id]], 1.0 / self.propensity_draws)
+            return arm_id, float(self.epsilon / n + (1 - self.epsilon) * p_model)
+
+        if self.epsilon <= 0:
+            return arm_id, 1.0
+        return arm_id, self.epsilon / n + (1 - self.epsilon if arm_id == greedy else 0.0)
 
     def infer(self):
         G = self.global_provider.get()
-        arm_id = self.inferencer.select_arm(G)
-        entry_idx = self.buffer.log_action(G, arm_id, self.arms[arm_id])
-        return arm_id, entry_idx
+        return self.infer_with_context(G)
+
     def infer_with_context(self, G):
-        arm_id = self.inferencer.select_arm(G)
-        idx = self.buffer.log_action(G, arm_id, self.arms[arm_id])
+        inferencer = self.inferencer     # one arm set per call, even across set_arms()
+        arm_id, p = self._explore(inferencer.select_arm(G), inferencer, G)
+        idx = self.buffer.log_action(G, arm_id, inferencer.arms[arm_id], propensity=p)
         return arm_id, idx
 
+    def infer_batch_with_context(self, Gs):
+        """
+        Score a batch of contexts (B, d_g) in one vectorized call.
+        Returns: list of (arm_id, idx), one per context
+        """
+        Gs = np.asarray(Gs, dtype=float)
+        inferencer = self.inferencer
+        results = []
+        for G, greedy in zip(Gs, inferencer.select_arm(Gs)):
+            arm_id, p = self._explore(greedy, inferencer, G)
+            idx = self.buffer.log_action(G, arm_id, inferencer.arms[arm_id], propensity=p)
+            results.append((arm_id, idx))
+        return results
+
     def give_reward(self, entry_idx, reward):
-        self.buffer.set_reward(entry_idx, reward)
-        samples = self.buffer.get_trainable_samples()
-        self.model.update(samples)    # simple design
+        self.give_rewards([(entry_idx, reward)])
+
+    def give_rewards(self, rewards):
+        """
+        rewards: list of (entry_idx, reward). All are folded into one model update.
+        """
+        if not rewards:
+            return
+        instr.count("rewards", len(rewards))
+        entries = [self.buffer.set_reward(entry_idx, reward) for entry_idx, reward in rewards]
+        dropped = entries.count(None)
+        if dropped:
+            # older than the history tail restored from a checkpoint
+            print(f"[Bandit] {dropped} rewards for dropped history entries ignored")
+
+        if getattr(self.model, "incremental", False):
+            # LinUCB / Thompson absorb each sample exactly once
+            samples = [e for e in entries if e is not None]
+        else:
+            samples = self.buffer.get_trainable_samples()
+
+        joint_samples = [s for s in samples if "A_dong" in s]
+        if joint_samples:
+            samples = [s for s in samples if "A_dong" not in s]
+        if self.trainer is not None:
+            if samples or joint_samples:
+                self.trainer.submit(samples, joint_samples)   # applied off-thread, published by swap
+            return
+        if joint_samples:
+            self.joint.update(joint_samples)
+        if samples:
+            with instr.span("model.update"):
+                self.model.update(samples)    # simple design
+
+    def enable_background_training(self):
+        """
+        Run model updates (joint (time, dong) ones included) on a worker
+        thread against a shadow copy; inference keeps reading the last
+        published snapshot (see BackgroundTrainer).
+        """
+        self.trainer = BackgroundTrainer(self).start()
+        return self.trainer
+
+    def set_arms(self, arms):
+        """
+        Replace the arm set (dict or ArmRegistry) while serving. A new
+        inferencer is fully built, then swapped in with one assignment;
+        in-flight calls finish on the old one; with enable_joint() the
+        joint ranking's time side is re-pointed to the new arms as well.
+        Usable as an ArmRegistry / ReloadableArms listener.
+        """
+        with self.lock:
+            inferencer = self.inferencer.with_model(self.model)
+            if inferencer.index is not None:
+                inferencer.index = copy.copy(inferencer.index)
+            inferencer.set_arms(arms)
+            joint = None
+            if self.joint is not None:
+                # the joint time side ranks the same arms as self.inferencer
+                joint = self.joint.with_models(self.model, self.joint.dong.model, self.joint.interaction)
+                joint.time = inferencer
+            self.inferencer = inferencer
+            self.arms = arms
+            if joint is not None:
+                self.joint = joint
+
+    # ------------------------------------------------------------------
+    # Joint (time slot, dong) arms
+    # ------------------------------------------------------------------
+    def enable_joint(self, dong_arms, dong_model, interaction=None):
+        """
+        Recommend (time, dong) pairs scored as f(G, time) + g(G, dong) [+ interaction].
+        self.model / self.arms act as the time side.
+        """
+        if self.trainer is not None:
+            self.trainer.flush()
+        with self.lock:
+            self.dong_arms = dong_arms
+            self.joint = JointInferencer(self.arms, dong_arms, self.model, dong_model, interaction)
+        if self.trainer is not None:
+            self.trainer.resync()
+
+    def infer_joint_with_context(self, G):
+        (time_id, dong_id), _ = self.joint.top_k_pairs(G, k=1)[0]
+        idx = self.buffer.log_action(G, (time_id, dong_id), self.arms[time_id],
+                                     A_dong=self.dong_arms[dong_id])
+        return (time_id, dong_id), idx
+
+    def rank_joint_with_context(self, G, k=3):
+        """
+        Top-k (time, dong) pairs without materializing the full product.
+        Returns: list of ((time_id, dong_id), score) tuples sorted by score descending
+        """
+        return self.joint.top_k_pairs(G, k)
         
-    def rank_arms_with_context(self, G):
+    def rank_arms_with_context(self, G, where=None, k=None):
         """
         Rank all arms given context G.
+        where: optional constraint (see bandit.inference.constraints), e.g.
+               "weekend & hour >= 18"; only matching arms are scored.
         Returns: list of (arm_id, score) tuples sorted by score descending
         """
+        if where is not None:
+            return self.inferencer.rank_where(G, where, k)
         ranked = self.inferencer.rank_arms(G)
-        return ranked
+        return ranked if k is None else ranked[:k]
     
     def save_weights(self, filepath):
-        """Save model weights to file"""
-        self.model.save_weights(filepath)
+        """Save model params, optimizer state, arms and history tail (bandit.core.checkpoint)"""
+        save_checkpoint(filepath, self.model, arms=self.arms, buffer=self.buffer)
         print(f"[Bandit] Weights saved to {filepath}")
-    
+
     def load_weights(self, filepath):
-        """Load model weights from file"""
-        self.model.load_weights(filepath)
+        """
+        Restore a checkpoint (memory-mapped, no retraining). It is loaded into
+        a fresh copy of the model that is then swapped in, so a published
+        snapshot is never written and in-flight calls finish on the old one.
+        """
+        if self.trainer is not None:
+            self.trainer.flush()
+        model = copy.deepcopy(self.model)
+        ckpt = load_checkpoint(filepath, model=model)
+        with self.lock:
+            self.inferencer = self.inferencer.with_model(model)
+            self.model = model
+            if self.joint is not None:
+                self.joint = self.joint.with_models(model, self.joint.dong.model, self.joint.interaction)
+        if self.trainer is not None:
+            self.trainer.resync()
+        if ckpt["arms"] is not None:
+            self.set_arms(ckpt["arms"])
+        self.buffer.restore(ckpt["history"], ckpt["history_offset"])
         print(f"[Bandit] Weights loaded from {filepath}")
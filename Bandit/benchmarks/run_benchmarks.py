@@ -0,0 +1,421 @@
+# bandit/benchmarks/run_benchmarks.py
+"""
+Synthetic-workload benchmarks for models, Inferencer and the serving front
+ends: BanditServer, AsyncBanditService, BanditSocketEndpoint and
+BanditServer on a SharedScoringPool (linear model only).
+
+    python -m bandit.benchmarks.run_benchmarks --out bench.json
+    python -m bandit.benchmarks.run_benchmarks --quick --models linear
+    python -m bandit.benchmarks.run_benchmarks --modes async socket shared_pool
+    python -m bandit.benchmarks.run_benchmarks --compare old.json   # flag regressions
+
+Every case runs in a fresh process so peak RSS is per case. Results are
+written as JSON (one record per case plus environment metadata, including
+the git commit) so runs can be diffed across commits.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing as mp
+import platform
+import queue
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+FULL_GRID = {
+    "num_arms": [10, 100, 1_000, 10_000, 100_000],
+    "dims": [(16, 16), (64, 64)],
+    "batch_size": [1, 32],
+    "reward_rate": [0.1, 1.0],
+}
+QUICK_GRID = {
+    "num_arms": [10, 1_000],
+    "dims": [(16, 16)],
+    "batch_size": [1, 32],
+    "reward_rate": [1.0],
+}
+
+
+def _make_model(name, d_g, d_a):
+    if name == "linear":
+        from bandit.models.linear_model import LinearModel
+        return LinearModel(d_g, d_a)
+    if name == "linucb":
+        from bandit.models.bilinear_bayes_model import LinUCBModel
+        return LinUCBModel(d_g, d_a)
+    if name == "neural":
+        from bandit.models.neural_model import NeuralModel
+        return NeuralModel(d_g, d_a, num_threads=1)
+    raise ValueError(f"unknown model {name!r}")
+
+
+def _percentiles(seconds):
+    ms = np.asarray(seconds) * 1e3
+    return {"p50_ms": float(np.percentile(ms, 50)), "p99_ms": float(np.percentile(ms, 99)),
+            "mean_ms": float(ms.mean())}
+
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0   # KiB on Linux
+
+
+def _samples(rng, n, d_g, d_a):
+    return [{"G": rng.standard_normal(d_g), "A": rng.standard_normal(d_a),
+             "reward": float(rng.random() < 0.5)} for _ in range(n)]
+
+
+# ----------------------------------------------------------------------
+# cases (each runs inside its own worker process)
+# ----------------------------------------------------------------------
+def bench_inference(model_name, num_arms, d_g, d_a, batch_size, iters, seed=0):
+    """Inferencer.select_arm latency for one batch of contexts, and model.update throughput."""
+    from bandit.inference.inferencer import Inferencer
+
+    rng = np.random.default_rng(seed)
+    model = _make_model(model_name, d_g, d_a)
+    arms = {f"arm_{i}": rng.standard_normal(d_a) for i in range(num_arms)}
+    inferencer = Inferencer(arms, model)
+
+    Gs = rng.standard_normal((iters, batch_size, d_g))
+    inferencer.select_arm(Gs[0])                     # warm-up (caches, torch init)
+    latencies = []
+    for G in Gs:
+        t0 = time.perf_counter()
+        inferencer.select_arm(G if batch_size > 1 else G[0])
+        latencies.append(time.perf_counter() - t0)
+
+    samples = _samples(rng, 256, d_g, d_a)
+    update_rounds = max(1, iters // 10)
+    t0 = time.perf_counter()
+    for _ in range(update_rounds):
+        model.update(samples)
+    update_elapsed = time.perf_counter() - t0
+
+    return {
+        "infer": _percentiles(latencies),
+        "infer_contexts_per_s": float(iters * batch_size / sum(latencies)),
+        "update_samples_per_s": float(update_rounds * len(samples) / update_elapsed),
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _make_bandit(model_name, num_arms, d_g, d_a, rng):
+    from bandit.bandit import ContextualBandit
+
+    model = _make_model(model_name, d_g, d_a)
+    arms = {f"arm_{i}": rng.standard_normal(d_a) for i in range(num_arms)}
+    return ContextualBandit(None, arms, model)
+
+
+def _drive_server(bandit_model, d_g, batch_size, reward_rate, iters, rng):
+    """Bursts of batch_size contexts through a BanditServer's in_q / out_q."""
+    from bandit.server.bandit_server import BanditServer
+
+    in_q, out_q = queue.Queue(), queue.Queue()
+    server = BanditServer(bandit_model, in_q, out_q, max_batch=max(batch_size, 1))
+
+    latencies = []
+    rewards = 0
+    with contextlib.redirect_stdout(io.StringIO()):    # the server logs every message
+        server.start()
+        t_start = time.perf_counter()
+        for burst in range(iters):
+            sent = {}
+            for i in range(batch_size):
+                request_id = f"{burst}-{i}"
+                sent[request_id] = time.perf_counter()
+                in_q.put({"type": "context", "request_id": request_id,
+                          "context": rng.standard_normal(d_g)})
+            for _ in range(batch_size):
+                msg = out_q.get()
+                latencies.append(time.perf_counter() - sent[msg["request_id"]])
+                if rng.random() < reward_rate:
+                    in_q.put({"type": "reward", "request_id": msg["request_id"],
+                              "reward": float(rng.random() < 0.5)})
+                    rewards += 1
+        while not in_q.empty():
+            time.sleep(0.001)
+        elapsed = time.perf_counter() - t_start
+        server.stop()
+        server.thread.join()
+
+    return {
+        "infer": _percentiles(latencies),
+        "requests_per_s": float(len(latencies) / elapsed),
+        "rewards": rewards,
+        "applied_rewards": server.metrics["applied_rewards"],
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def bench_server(model_name, num_arms, d_g, d_a, batch_size, reward_rate, iters, seed=0):
+    """
+    BanditServer end to end: contexts are put on in_q in bursts of batch_size
+    and latency is measured until their infer_result leaves out_q. A fraction
+    reward_rate of results is rewarded (by request id).
+    """
+    rng = np.random.default_rng(seed)
+    bandit = _make_bandit(model_name, num_arms, d_g, d_a, rng)
+    return _drive_server(bandit, d_g, batch_size, reward_rate, iters, rng)
+
+
+def bench_shared_pool(model_name, num_arms, d_g, d_a, batch_size, reward_rate, iters,
+                      seed=0, n_workers=2):
+    """
+    bench_server with a SharedScoringPool as the server's bandit: each
+    micro-batch is scored by n_workers processes on the shared weights, and
+    every applied reward republishes M. Plain bilinear models only.
+    """
+    from bandit.server.shared_scoring import SharedScoringPool
+
+    rng = np.random.default_rng(seed)
+    pool = SharedScoringPool(_make_bandit(model_name, num_arms, d_g, d_a, rng), n_workers=n_workers)
+    try:
+        pool.select_rows(rng.standard_normal((n_workers, d_g)))    # warm-up: workers attached
+        metrics = _drive_server(pool, d_g, batch_size, reward_rate, iters, rng)
+    finally:
+        pool.close()
+    return dict(metrics, n_workers=n_workers)
+
+
+def bench_async(model_name, num_arms, d_g, d_a, batch_size, reward_rate, iters, seed=0):
+    """
+    AsyncBanditService: bursts of batch_size concurrent infer() calls on one
+    event loop; latency is per awaited call. A fraction reward_rate of the
+    results is rewarded with reward().
+    """
+    import asyncio
+
+    from bandit.server.async_bandit import AsyncBanditService
+
+    rng = np.random.default_rng(seed)
+    bandit = _make_bandit(model_name, num_arms, d_g, d_a, rng)
+    latencies = []
+
+    async def timed_infer(service, G):
+        t0 = time.perf_counter()
+        result = await service.infer(G)
+        latencies.append(time.perf_counter() - t0)
+        return result
+
+    async def main():
+        rewards = applied = 0
+        async with AsyncBanditService(bandit, max_batch=max(batch_size, 1)) as service:
+            t_start = time.perf_counter()
+            for _ in range(iters):
+                results = await asyncio.gather(*[timed_infer(service, G)
+                                                 for G in rng.standard_normal((batch_size, d_g))])
+                for result in results:
+                    if rng.random() < reward_rate:
+                        ack = await service.reward(result["request_id"], float(rng.random() < 0.5))
+                        rewards += 1
+                        applied += ack["status"] == "applied"
+            elapsed = time.perf_counter() - t_start
+        return rewards, applied, elapsed
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        rewards, applied, elapsed = asyncio.run(main())
+
+    return {
+        "infer": _percentiles(latencies),
+        "requests_per_s": float(len(latencies) / elapsed),
+        "rewards": rewards,
+        "applied_rewards": applied,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def bench_socket(model_name, num_arms, d_g, d_a, batch_size, reward_rate, iters, seed=0):
+    """
+    BanditSocketEndpoint over a Unix socket: one client pipelines bursts of
+    batch_size binary context frames and waits for their replies; latency is
+    per request, from send to reply. Rewards are sent on the same connection.
+    """
+    import os
+    import tempfile
+
+    from bandit.server.bandit_server import BanditServer
+    from bandit.server.socket_endpoint import BanditSocketClient, BanditSocketEndpoint
+
+    rng = np.random.default_rng(seed)
+    bandit = _make_bandit(model_name, num_arms, d_g, d_a, rng)
+    server = BanditServer(bandit, queue.Queue(), queue.Queue(), max_batch=max(batch_size, 1))
+
+    latencies = []
+    rewards = 0
+    address = os.path.join(tempfile.mkdtemp(), "bandit.sock")
+    with contextlib.redirect_stdout(io.StringIO()):
+        server.start()
+        endpoint = BanditSocketEndpoint(server, address).start()
+        with BanditSocketClient(address) as client:
+            t_start = time.perf_counter()
+            for burst in range(iters):
+                sent = {}
+                for i, G in enumerate(rng.standard_normal((batch_size, d_g))):
+                    request_id = f"{burst}-{i}"
+                    sent[request_id] = time.perf_counter()
+                    client.send_context(G, request_id)
+                for msg in client.collect(list(sent)):
+                    latencies.append(time.perf_counter() - sent[msg["request_id"]])
+                    if rng.random() < reward_rate:
+                        client.reward(msg["request_id"], float(rng.random() < 0.5))
+                        rewards += 1
+            while not server.in_q.empty():
+                time.sleep(0.001)
+            elapsed = time.perf_counter() - t_start
+        endpoint.stop()
+        server.stop()
+        server.thread.join()
+    os.unlink(address)
+
+    return {
+        "infer": _percentiles(latencies),
+        "requests_per_s": float(len(latencies) / elapsed),
+        "rewards": rewards,
+        "applied_rewards": server.metrics["applied_rewards"],
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+# ----------------------------------------------------------------------
+# driver
+# ----------------------------------------------------------------------
+# end-to-end modes: each takes (model, num_arms, d_g, d_a, batch_size, reward_rate, iters)
+FRONT_ENDS = {
+    "server": bench_server,
+    "async": bench_async,
+    "socket": bench_socket,
+    "shared_pool": bench_shared_pool,
+}
+# SharedScoringPool scores greedy G @ M @ A.T; LinUCB / neural are rejected
+SHARED_POOL_MODELS = ("linear",)
+
+
+def _cases(grid, models, modes, iters):
+    for model_name in models:
+        for num_arms in grid["num_arms"]:
+            for d_g, d_a in grid["dims"]:
+                for batch_size in grid["batch_size"]:
+                    params = {"model": model_name, "num_arms": num_arms, "d_g": d_g,
+                              "d_a": d_a, "batch_size": batch_size}
+                    if "inference" in modes:
+                        yield "inference", params, (bench_inference, model_name, num_arms,
+                                                    d_g, d_a, batch_size, iters)
+                    for mode in ("server", "async", "socket", "shared_pool"):
+                        if mode not in modes:
+                            continue
+                        if mode == "shared_pool" and model_name not in SHARED_POOL_MODELS:
+                            continue
+                        for reward_rate in grid["reward_rate"]:
+                            yield (mode, dict(params, reward_rate=reward_rate),
+                                   (FRONT_ENDS[mode], model_name, num_arms, d_g, d_a,
+                                    batch_size, reward_rate, iters))
+
+
+def _run_case(fn, *args):
+    return fn(*args)
+
+
+def _environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": mp.cpu_count(),
+    }
+
+
+def run(grid, models, modes, iters, out=None):
+    results = []
+    ctx = mp.get_context("spawn")
+    for mode, params, (fn, *args) in _cases(grid, models, modes, iters):
+        # a fresh process per case → peak RSS belongs to that case alone
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            try:
+                metrics = pool.submit(_run_case, fn, *args).result()
+                record = {"mode": mode, **params, **metrics}
+            except Exception as e:
+                record = {"mode": mode, **params, "error": repr(e)}
+        results.append(record)
+        print(json.dumps(record))
+
+    report = {"environment": _environment(), "iters": iters, "results": results}
+    if out:
+        with open(out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"[bench] wrote {len(results)} results to {out}")
+    return report
+
+
+_KEY_FIELDS = ("mode", "model", "num_arms", "d_g", "d_a", "batch_size", "reward_rate")
+
+
+def compare(baseline, report, tolerance=0.2):
+    """
+    Cases whose p99 latency grew (or throughput shrank) by more than
+    tolerance relative to baseline. Returns a list of regression records.
+    """
+    def key(r):
+        return tuple(r.get(f) for f in _KEY_FIELDS)
+
+    old = {key(r): r for r in baseline["results"] if "error" not in r}
+    regressions = []
+    for r in report["results"]:
+        b = old.get(key(r))
+        if b is None or "error" in r:
+            continue
+        checks = [("p99_ms", b["infer"]["p99_ms"], r["infer"]["p99_ms"], +1)]
+        for field in ("infer_contexts_per_s", "update_samples_per_s", "requests_per_s"):
+            if field in r and field in b:
+                checks.append((field, b[field], r[field], -1))
+        for field, before, after, sign in checks:
+            if before > 0 and sign * (after - before) / before > tolerance:
+                regressions.append({**{f: r.get(f) for f in _KEY_FIELDS},
+                                    "metric": field, "before": before, "after": after})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--models", nargs="+", default=["linear", "linucb", "neural"])
+    parser.add_argument("--modes", nargs="+", default=["inference", *FRONT_ENDS],
+                        choices=["inference", *FRONT_ENDS])
+    parser.add_argument("--num-arms", nargs="+", type=int)
+    parser.add_argument("--iters", type=int, default=200)
+    parser.add_argument("--quick", action="store_true", help="small grid for smoke runs")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    grid = dict(QUICK_GRID if args.quick else FULL_GRID)
+    if args.num_arms:
+        grid["num_arms"] = args.num_arms
+    report = run(grid, args.models, args.modes, args.iters, args.out)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), report, args.tolerance)
+        for r in regressions:
+            print(f"[bench] REGRESSION {json.dumps(r)}")
+        print(f"[bench] {len(regressions)} regressions vs {args.compare}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 import json
 import numpy as np
 
+from bandit.core.arm_registry import ArmRegistry
+
 class ArmContextProvider:
     def __init__(self, mode="random", num_arms=10, dim=16, file_path=None):
         self.mode = mode
@@ -16,3 +18,9 @@ class ArmContextProvider:
                 return json.load(f)  # dict {arm_id: embedding vector}
         else:
             raise ValueError("Unknown arm mode")
+
+    def load_registry(self):
+        """Same arms as load(), as a float32 ArmRegistry (schedule metadata parsed in real mode)."""
+        if self.mode == "real":
+            return ArmRegistry.from_schedule_vectors(self.file_path)
+        return ArmRegistry.from_dict(self.load())
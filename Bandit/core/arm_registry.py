@@ -0,0 +1,200 @@
+# bandit/core/arm_registry.py
+
+import datetime
+import json
+import logging
+import os
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+LOCATION_FEATURES = ("X", "Y", "age_score", "population_score", "cost_score",
+                     "subway_score", "bus_score", "car_score", "store_score")
+
+
+class ArmRegistry(Mapping):
+    """
+    Immutable snapshot of an arm set.
+
+        ids       list of arm ids; row i of matrix belongs to ids[i]
+        index     {arm_id: row}
+        matrix    (n_arms, d_a) contiguous float32, read-only
+        metadata  columns aligned with the rows:
+                    date  datetime64[D]  (NaT for location arms)
+                    hour  int            (-1 for location arms)
+                    gu    str            ("" for schedule arms)
+                    dong  str            ("" for schedule / gu arms)
+
+    It is a Mapping {arm_id: row vector}, so it can be passed anywhere an
+    arms dict is expected (ContextualBandit, Inferencer, checkpoints). The
+    Inferencer uses ids / matrix directly instead of re-stacking.
+    """
+
+    def __init__(self, ids, matrix, metadata=None, source=None):
+        self.ids = list(ids)
+        self.index = {arm_id: i for i, arm_id in enumerate(self.ids)}
+        if len(self.index) != len(self.ids):
+            raise ValueError("duplicate arm ids")
+
+        self.matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        self.matrix.setflags(write=False)
+
+        n = len(self.ids)
+        metadata = dict(metadata or {})
+        self.metadata = {
+            "date": np.asarray(metadata.get("date", np.full(n, "NaT")), dtype="datetime64[D]"),
+            "hour": np.asarray(metadata.get("hour", np.full(n, -1)), dtype=int),
+            "gu": np.asarray(metadata.get("gu", np.full(n, "")), dtype=object),
+            "dong": np.asarray(metadata.get("dong", np.full(n, "")), dtype=object),
+        }
+        self.source = source
+        self._unique = None
+
+    def unique(self):
+        """(unique_matrix, inverse): distinct arm vectors and, per row, its unique row."""
+        if self._unique is None:
+            if len(self.ids):
+                unique, inverse = np.unique(self.matrix, axis=0, return_inverse=True)
+            else:
+                unique, inverse = self.matrix, np.empty(0, dtype=int)
+            self._unique = (unique, inverse.reshape(-1))
+        return self._unique
+
+    # ------------------------------------------------------------------
+    # Mapping
+    # ------------------------------------------------------------------
+    def __getitem__(self, arm_id):
+        return self.matrix[self.index[arm_id]]
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, arm_id):
+        return arm_id in self.index
+
+    def meta(self, arm_id):
+        """Metadata of one arm as a plain dict."""
+        i = self.index[arm_id]
+        return {name: col[i] for name, col in self.metadata.items()}
+
+    # ------------------------------------------------------------------
+    # loaders
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_dict(cls, arms, metadata=None):
+        """Any {arm_id: vector} dict (ArmContextProvider.load, random or real mode)."""
+        ids = list(arms.keys())
+        matrix = np.stack([np.asarray(arms[a], dtype=np.float32) for a in ids]) if ids \
+            else np.empty((0, 0), dtype=np.float32)
+        return cls(ids, matrix, metadata)
+
+    @classmethod
+    def from_schedule_vectors(cls, path):
+        """
+        schedule_arm_vectors.json: {"YYYY-MM-DD-HH": [10 floats]}
+        Rows are ordered by (date, hour), so score ties resolve to the earliest slot.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+
+        parsed = sorted((tuple(map(int, key.split("-"))), key) for key in raw)
+        ids = [key for _, key in parsed]
+        dates = [datetime.date(y, m, d).isoformat() for (y, m, d, _), _ in parsed]
+        hours = [h for (_, _, _, h), _ in parsed]
+        return cls(ids, np.asarray([raw[k] for k in ids], dtype=np.float32),
+                   {"date": dates, "hour": hours}, source=str(path))
+
+    @classmethod
+    def from_location_context(cls, path, features=LOCATION_FEATURES):
+        """
+        location_context_dong.json / location_context_gu.json: list of
+        {"구", ["동"], X, Y, ...scores}. Arm id is "{gu}_{dong}" (dong names
+        repeat across gu; same keys as DongArmIndex) or "구" for gu-level files.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            rows = json.load(f)
+
+        gus = [r.get("구", "") for r in rows]
+        dongs = [r.get("동", "") for r in rows]
+        ids = [f"{g}_{d}" if d else g for g, d in zip(gus, dongs)]
+        matrix = np.asarray([[r.get(k, 0.0) for k in features] for r in rows], dtype=np.float32)
+        return cls(ids, matrix, {"gu": gus, "dong": dongs}, source=str(path))
+
+
+class ReloadableArms:
+    """
+    Holds the current ArmRegistry and swaps in a new one when its source
+    files change, without restarting the bandit.
+
+        arms = ReloadableArms(lambda: ArmRegistry.from_schedule_vectors(p), [p])
+        arms.subscribe(bandit.set_arms)
+        arms.start()                       # polls mtimes every `interval` s
+
+    The new registry is built completely before it is published (one
+    reference assignment), so readers see either the old or the new arm set.
+    A file that fails to parse keeps the old registry; a listener that
+    raises is logged and skipped, the others are still notified.
+    """
+
+    def __init__(self, loader, paths, interval=2.0):
+        self.loader = loader
+        self.paths = [Path(p) for p in paths]
+        self.interval = interval
+        self.current = loader()
+        self.version = 0
+        self._mtimes = self._stat()
+        self._listeners = []
+        self._stop = threading.Event()
+
+    def _stat(self):
+        return tuple(os.stat(p).st_mtime_ns if p.exists() else None for p in self.paths)
+
+    def subscribe(self, fn):
+        """fn(registry) is called after every successful reload."""
+        self._listeners.append(fn)
+
+    def reload(self):
+        """Rebuild and publish now. Returns True if a new registry was published."""
+        try:
+            registry = self.loader()
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("reload failed, keeping version %d: %s", self.version, e)
+            return False
+
+        self.current = registry
+        self.version += 1
+        for fn in self._listeners:
+            try:
+                fn(registry)
+            except Exception:
+                logger.exception("arms listener %r failed on version %d", fn, self.version)
+        logger.info("reloaded %d arms (version %d)", len(registry), self.version)
+        return True
+
+    def check(self):
+        """Reload if any source file changed since the last check."""
+        mtimes = self._stat()
+        if mtimes == self._mtimes:
+            return False
+        self._mtimes = mtimes
+        return self.reload()
+
+    def start(self):
+        def loop():
+            while not self._stop.wait(self.interval):
+                try:
+                    self.check()
+                except Exception:
+                    logger.exception("arms reload check failed")
+        threading.Thread(target=loop, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
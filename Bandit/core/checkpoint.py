@@ -0,0 +1,227 @@
+# bandit/core/checkpoint.py
+
+"""
+Checkpoint layout (one directory):
+
+    meta.json           schema_version, model_type, JSON-able model state,
+                        arm ids (+ gu / dong of an ArmRegistry), history arm
+                        ids, array manifest
+    <name>.npy          one file per array (model params, optimizer state,
+                        arm matrix, history tail)
+
+Arrays are loaded with np.load(mmap_mode="c"): pages are mapped lazily and
+writes stay private to the process, so a server restart does no parsing and
+no copying until the weights are actually touched.
+
+A save writes <path>.tmp-<pid>, moves the previous checkpoint to
+<path>.old-<pid>, moves the new one to <path> and only then deletes the old
+one. Readers that find no <path> (a save between its two renames, or one
+that crashed there) load the <path>.old-* checkpoint instead.
+"""
+
+import json
+import os
+import shutil
+import importlib
+from pathlib import Path
+
+import numpy as np
+
+from bandit.core.arm_registry import ArmRegistry
+
+# bump when the on-disk layout changes; older readers refuse newer checkpoints
+CHECKPOINT_VERSION = 1
+HISTORY_TAIL = 1000
+
+# model_type → module, imported lazily (NeuralModel pulls in torch)
+MODEL_MODULES = {
+    "LinearModel": "bandit.models.linear_model",
+    "NeuralModel": "bandit.models.neural_model",
+    "LinUCBModel": "bandit.models.bilinear_bayes_model",
+    "ThompsonSamplingModel": "bandit.models.bilinear_bayes_model",
+    "BaseModel": "bandit.models.base_model_ver1",
+    "ResidualLinearModel": "bandit.models.residual_model",
+}
+
+
+def _array_file(name):
+    return name.replace("/", "_") + ".npy"
+
+
+def save_checkpoint(path, model, arms=None, buffer=None, history_tail=HISTORY_TAIL):
+    """
+    model: any model with state_dict()
+    arms: dict {arm_id: vector} or ArmRegistry (optional; a registry keeps
+          its row order and metadata)
+    buffer: HistoryBuffer (optional) → last `history_tail` entries are kept
+    """
+    path = Path(path)
+    tmp = path.with_name(path.name + f".tmp-{os.getpid()}")
+    if tmp.exists():
+        shutil.rmtree(tmp)
+    tmp.mkdir(parents=True)
+
+    arrays = {}
+    state_json = {}
+    for key, value in model.state_dict().items():
+        if isinstance(value, np.ndarray):
+            arrays[f"model/{key}"] = value
+        else:
+            state_json[key] = value
+
+    meta = {
+        "schema_version": CHECKPOINT_VERSION,
+        "model_type": type(model).__name__,
+        "model_state": state_json,
+        "arm_ids": None,
+        "arm_metadata": None,
+        "history_arm_ids": None,
+        "history_offset": 0,
+    }
+
+    if isinstance(arms, ArmRegistry):
+        meta["arm_ids"] = list(arms.ids)
+        meta["arm_metadata"] = {"gu": [str(g) for g in arms.metadata["gu"]],
+                                "dong": [str(d) for d in arms.metadata["dong"]],
+                                "source": arms.source}
+        arrays["arms/matrix"] = arms.matrix
+        arrays["arms/date"] = arms.metadata["date"]
+        arrays["arms/hour"] = arms.metadata["hour"]
+    elif arms:
+        arm_ids = list(arms.keys())
+        meta["arm_ids"] = arm_ids
+        arrays["arms/matrix"] = np.stack([np.asarray(arms[a], dtype=float) for a in arm_ids])
+
+    if buffer is not None and buffer.history:
+        tail = buffer.history[-history_tail:]
+        # buffer idx of tail[0], so idx handed out before the save still resolve after a restore
+        meta["history_offset"] = getattr(buffer, "offset", 0) + len(buffer.history) - len(tail)
+        # joint (time, dong) actions carry a tuple arm_id; JSON stores it as a list
+        meta["history_arm_ids"] = [list(h["arm_id"]) if isinstance(h["arm_id"], tuple) else h["arm_id"]
+                                   for h in tail]
+        arrays["history/G"] = np.stack([np.asarray(h["G"], dtype=float) for h in tail])
+        arrays["history/A"] = np.stack([np.asarray(h["A"], dtype=float) for h in tail])
+        arrays["history/reward"] = np.array(
+            [np.nan if h["reward"] is None else h["reward"] for h in tail], dtype=float)
+        arrays["history/propensity"] = np.array(
+            [h.get("propensity", np.nan) for h in tail], dtype=float)
+        dong = [h.get("A_dong") for h in tail]
+        d_dong = next((len(a) for a in dong if a is not None), None)
+        if d_dong is not None:
+            # NaN rows for entries that are not joint actions
+            arrays["history/A_dong"] = np.stack([np.full(d_dong, np.nan) if a is None
+                                                 else np.asarray(a, dtype=float) for a in dong])
+
+    meta["arrays"] = {name: _array_file(name) for name in arrays}
+    for name, value in arrays.items():
+        np.save(tmp / _array_file(name), np.ascontiguousarray(value))
+
+    with open(tmp / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+    # swap in the finished directory so readers never see a half-written checkpoint
+    old = path.with_name(path.name + f".old-{os.getpid()}")
+    if path.exists():
+        path.rename(old)
+    tmp.rename(path)
+    if old.exists():
+        shutil.rmtree(old)
+
+
+def _checkpoint_dir(path):
+    """path, or the previous checkpoint a save has moved aside while swapping."""
+    path = Path(path)
+    for _ in range(3):
+        if (path / "meta.json").exists():
+            return path
+        old = sorted(path.parent.glob(path.name + ".old-*"))
+        if old:
+            return old[-1]
+        # both renames may have completed between the two checks above
+    raise FileNotFoundError(f"No checkpoint at {path}")
+
+
+def read_meta(path):
+    with open(_checkpoint_dir(path) / "meta.json", "r", encoding="utf-8") as f:
+        meta = json.load(f)
+
+    version = meta.get("schema_version")
+    if version is None or version > CHECKPOINT_VERSION:
+        raise ValueError(
+            f"Unsupported checkpoint schema_version={version} "
+            f"(this build reads <= {CHECKPOINT_VERSION})"
+        )
+    return meta
+
+
+def build_model(model_type, state):
+    if model_type not in MODEL_MODULES:
+        raise ValueError(f"Unknown model_type in checkpoint: {model_type}")
+    cls = getattr(importlib.import_module(MODEL_MODULES[model_type]), model_type)
+    model = cls(**{k: state[k] for k in cls.CONFIG_KEYS})
+    model.load_state_dict(state)
+    return model
+
+
+def load_checkpoint(path, model=None, mmap=True):
+    """
+    Returns:
+        {
+            "model": model (restored in place if given, otherwise built from meta),
+            "arms": dict {arm_id: vector}, ArmRegistry (if one was saved) or None,
+            "history": list of HistoryBuffer entries (tail),
+            "history_offset": buffer idx of history[0] (HistoryBuffer.restore),
+            "meta": meta dict
+        }
+    """
+    path = _checkpoint_dir(path)
+    meta = read_meta(path)
+    mmap_mode = "c" if mmap else None
+    arrays = {name: np.load(path / fname, mmap_mode=mmap_mode)
+              for name, fname in meta["arrays"].items()}
+
+    state = dict(meta["model_state"])
+    for name, value in arrays.items():
+        if name.startswith("model/"):
+            state[name[len("model/"):]] = value
+
+    if model is None:
+        model = build_model(meta["model_type"], state)
+    else:
+        if type(model).__name__ != meta["model_type"]:
+            raise ValueError(
+                f"Checkpoint holds {meta['model_type']}, cannot load into {type(model).__name__}"
+            )
+        model.load_state_dict(state)
+
+    arms = None
+    arm_metadata = meta.get("arm_metadata")
+    if arm_metadata is not None:
+        arms = ArmRegistry(meta["arm_ids"], arrays["arms/matrix"],
+                           {"date": arrays["arms/date"], "hour": arrays["arms/hour"],
+                            "gu": arm_metadata["gu"], "dong": arm_metadata["dong"]},
+                           source=arm_metadata.get("source"))
+    elif meta["arm_ids"] is not None:
+        matrix = arrays["arms/matrix"]
+        arms = {arm_id: matrix[i] for i, arm_id in enumerate(meta["arm_ids"])}
+
+    history = []
+    if meta["history_arm_ids"] is not None:
+        G, A, R = arrays["history/G"], arrays["history/A"], arrays["history/reward"]
+        P = arrays.get("history/propensity")
+        D = arrays.get("history/A_dong")
+        for i, arm_id in enumerate(meta["history_arm_ids"]):
+            entry = {
+                "G": G[i],
+                "arm_id": tuple(arm_id) if isinstance(arm_id, list) else arm_id,
+                "A": A[i],
+                "reward": None if np.isnan(R[i]) else float(R[i])
+            }
+            if P is not None and not np.isnan(P[i]):
+                entry["propensity"] = float(P[i])
+            if D is not None and not np.isnan(D[i]).all():
+                entry["A_dong"] = D[i]
+            history.append(entry)
+
+    return {"model": model, "arms": arms, "history": history,
+            "history_offset": meta.get("history_offset", 0), "meta": meta}
@@ -5,7 +5,9 @@ import itertools
 from pathlib import Path
 
 from bandit.core.compute_rank_all import compute_rank_all
-from embedding.infer_pipeline import embed_for_agent  # for global context embedding
+import numpy as np
+
+from embedding.infer_pipeline import embed_for_agent, project  # for global context embedding
 
 
 class DatasetLoader:
@@ -17,7 +19,8 @@ class DatasetLoader:
                  gu_score_dir,
                  schedule_score_dir,
                  schedule_arm_path,
-                 g_dim=16):
+                 g_dim=None,
+                 featurizer=None):
         """
         user_ids: 전체 사용자 id 리스트 ["1","2","3","4"...]
         base_info_dir: Base_Info_x.json dir
@@ -29,7 +32,14 @@ class DatasetLoader:
             Person_x_Schedule_Score.json
 
         schedule_arm_path: schedule_arm_vectors.json
+        featurizer: optional GroupFeaturizer → global context from structured
+                    features instead of the embedding model
+        g_dim: global context size (default 16, or featurizer.dim); must match
+               featurizer.dim when a featurizer is given
         """
+        if featurizer is not None and g_dim is not None and g_dim != featurizer.dim:
+            raise ValueError(f"g_dim={g_dim} does not match the featurizer's "
+                             f"{featurizer.dim}-dim group features")
         self.user_ids = [str(uid) for uid in user_ids]
         self.base_info_dir = Path(base_info_dir)
         self.schedule_info_dir = Path(schedule_info_dir)
@@ -39,7 +49,8 @@ class DatasetLoader:
         self.schedule_dir = Path(schedule_score_dir)
 
         self.schedule_arm_path = Path(schedule_arm_path)
-        self.g_dim = g_dim
+        self.g_dim = g_dim or (featurizer.dim if featurizer is not None else 16)
+        self.featurizer = featurizer
 
         # 로드용 캐시
         self.user_cache = {}
@@ -81,7 +92,10 @@ class DatasetLoader:
     # -------------------------------------------------------------------------
     # STEP 3 : base+schedule JSON merge → embed
     # -------------------------------------------------------------------------
-    def embed_user_group(self, group_ids):
+    def embed_user_group(self, group_ids, project_to_context=True):
+        if self.featurizer is not None:
+            return self.featurizer.features(group_ids)
+
         try:
             merged_text = ""
 
@@ -100,10 +114,17 @@ class DatasetLoader:
             # fallback: 그냥 텍스트 concat
             merged_text = "\n".join([f"[User {u}]" for u in group_ids])
 
-        # embed_for_agent → 16-dim 반환 (projected)
-        g_vec = embed_for_agent(merged_text)
+        # embed_for_agent → g_dim 반환 (projected)
+        g_vec = embed_for_agent(merged_text, project_to_context=project_to_context)
         return g_vec
 
+    def embed_user_groups(self, groups):
+        """All groups → (n_groups, g_dim); raw embeddings are projected in one batch matmul."""
+        if self.featurizer is not None:
+            return self.featurizer.features_batch(groups)
+        raw = np.stack([self.embed_user_group(g, project_to_context=False) for g in groups])
+        return project(raw)
+
     # -------------------------------------------------------------------------
     # STEP 4 : reward 계산 함수
     # simple baseline : top=1.0, bottom≈0
@@ -138,16 +159,16 @@ class DatasetLoader:
 
         print(f"[dataset] total user groups = {len(groups)}")
 
-        for group in groups:
+        # embedding vectors (global context), projected as one batch
+        contexts = self.embed_user_groups(groups)
+
+        for group, g_vec in zip(groups, contexts):
 
             # 1) ranking 계산
             ranks = compute_rank_all(group, self.user_cache)
             sched_rank = ranks["schedule_rank"]  # list sorted
 
-            # 2) embedding vector (global context)
-            g_vec = self.embed_user_group(group)
-
-            # 3) 각 arm에 대해 dataset entry 생성
+            # 2) 각 arm에 대해 dataset entry 생성
             for arm_key, arm_vec in schedule_arms.items():
                 reward = self.reward_from_rank(sched_rank, "schedule", arm_key)
 
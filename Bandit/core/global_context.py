@@ -1,19 +1,39 @@
 import numpy as np
 
 class GlobalContextProvider:
-    def __init__(self, mode="random", dim=16):
+    def __init__(self, mode="random", dim=None, featurizer=None, group=None):
+        """
+        dim: context size (random mode default 16). In real mode it must
+             match featurizer.dim (None → featurizer.dim); models are built
+             with d_g = provider.dim.
+        real mode: featurizer is a GroupFeaturizer (Base_Info / Schedule_Info
+                   features, no embedding model).
+        group: user ids of the current group (set_group() to change it)
+        """
         self.mode = mode
-        self.dim = dim
+        self.dim = 16 if dim is None else dim
+        self.featurizer = featurizer
+        self.group = group
+        if mode == "real":
+            if featurizer is None:
+                raise ValueError("real context mode needs a GroupFeaturizer")
+            if dim is not None and dim != featurizer.dim:
+                raise ValueError(f"dim={dim} does not match the featurizer's "
+                                 f"{featurizer.dim}-dim group features")
+            self.dim = featurizer.dim
 
-    def get(self):
+    def set_group(self, group):
+        self.group = list(group)
+
+    def get(self, group=None):
         if self.mode == "random":
             return np.random.randn(self.dim)
         elif self.mode == "real":
-            # TODO: 실제 스케줄, 시간대 등에서 feature 추출
-            return self._load_real_context()
+            return self._load_real_context(group if group is not None else self.group)
         else:
             raise ValueError("Unknown context mode")
 
-    def _load_real_context(self):
-        # placeholder
-        return np.random.randn(self.dim)
+    def _load_real_context(self, group):
+        if not group:
+            raise ValueError("real context needs a group of user ids (set_group)")
+        return self.featurizer.features(group)
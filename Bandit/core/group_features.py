@@ -0,0 +1,166 @@
+# bandit/core/group_features.py
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+HOUR_BINS = 6                         # 4-hour bins over the day
+SEOUL_CENTER = (37.5665, 126.9780)
+KM_PER_DEG = (111.0, 88.2)            # lat, lon at ~37.5°N
+OVERLAP_KM = 2.0                      # preferred areas closer than this "overlap"
+
+# feature layout (float32), FEATURE_DIM long
+FEATURE_NAMES = (
+    [f"avail_{d}" for d in WEEKDAYS]                      # mean member availability per weekday
+    + [f"avail_h{4 * i:02d}" for i in range(HOUR_BINS)]   # ... per 4-hour bin
+    + [f"joint_{d}" for d in WEEKDAYS]                    # everyone available at once
+    + [f"joint_h{4 * i:02d}" for i in range(HOUR_BINS)]
+    + ["age_mean", "age_std", "male_frac", "female_frac"]
+    + ["home_lat", "home_lon", "home_spread_km"]
+    + ["pref_overlap", "pref_nearest_km", "home_to_pref_km", "group_size"]
+)
+FEATURE_DIM = len(FEATURE_NAMES)
+
+
+def _km(a, b):
+    """Equirectangular distance (km) between (..., 2) lat/lon arrays."""
+    d = (np.asarray(a) - np.asarray(b)) * KM_PER_DEG
+    return np.sqrt((d ** 2).sum(axis=-1))
+
+
+class GroupFeaturizer:
+    """
+    Fixed-length float32 group context from Base_Info / Schedule_Info, without
+    the embedding model.
+
+    Per user (parsed once and cached):
+        avail  (n_days, 24) bool   free hours over the General_Info horizon
+        age, gender, residence, preferred areas
+
+    Per group (cached by sorted member ids): the FEATURE_NAMES vector —
+    availability histograms by weekday / hour (mean and all-members-free),
+    age and gender mix, residence centroid and spread, preferred-area overlap.
+    Values are scaled to roughly [0, 1] / unit range.
+    """
+
+    dim = FEATURE_DIM
+
+    def __init__(self, base_info_dir, schedule_info_dir, general_info_path=None,
+                 start=None, end=None, max_cache=4096):
+        self.base_info_dir = Path(base_info_dir)
+        self.schedule_info_dir = Path(schedule_info_dir)
+
+        if general_info_path is not None:
+            with open(general_info_path, "r", encoding="utf-8") as f:
+                info = json.load(f)
+            start = start or info["start"]
+            end = end or info["end"]
+        self.days = np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1)
+        self.day_weekday = (self.days.astype("int64") + 3) % 7     # Monday == 0
+
+        self.max_cache = max_cache
+        self._users = {}
+        self._groups = {}
+
+    # ------------------------------------------------------------------
+    # per user
+    # ------------------------------------------------------------------
+    def _load_json(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _user(self, uid):
+        uid = str(uid)
+        user = self._users.get(uid)
+        if user is not None:
+            return user
+
+        base = self._load_json(self.base_info_dir / f"Base_Info_{uid}.json")
+        schedule = self._load_json(self.schedule_info_dir / f"Schedule_Info_{uid}.json")
+
+        avail = np.zeros((len(self.days), 24), dtype=bool)
+        start = self.days[0]
+        hours = np.arange(24)
+        for date, intervals in schedule.items():
+            d = int((np.datetime64(date, "D") - start).astype(int))
+            if not 0 <= d < len(self.days):
+                continue
+            for lo, hi in intervals:
+                avail[d] |= (hours >= lo) & (hours + 1 <= hi)
+
+        user = {
+            "avail": avail,
+            "age": float(base.get("age", 0)),
+            "gender": base.get("gender", ""),
+            "home": np.asarray(base.get("current_residence", SEOUL_CENTER), dtype=float),
+            "preferred": np.asarray(base.get("preferred_areas") or [base.get("current_residence", SEOUL_CENTER)],
+                                    dtype=float).reshape(-1, 2),
+        }
+        self._users[uid] = user
+        return user
+
+    # ------------------------------------------------------------------
+    # per group
+    # ------------------------------------------------------------------
+    def _histograms(self, avail):
+        """avail (n_days, 24) float → weekday (7,) and hour-bin (6,) fractions."""
+        weekday = np.array([avail[self.day_weekday == w].mean() if (self.day_weekday == w).any() else 0.0
+                            for w in range(7)])
+        hour = avail.reshape(len(avail), HOUR_BINS, 24 // HOUR_BINS).mean(axis=(0, 2))
+        return weekday, hour
+
+    def _compute(self, members):
+        users = [self._user(uid) for uid in members]
+        stack = np.stack([u["avail"] for u in users])          # (n, n_days, 24)
+
+        mean_wd, mean_h = self._histograms(stack.mean(axis=0))
+        joint_wd, joint_h = self._histograms(stack.all(axis=0).astype(float))
+
+        ages = np.array([u["age"] for u in users])
+        genders = [u["gender"].lower() for u in users]
+
+        homes = np.stack([u["home"] for u in users])
+        centroid = homes.mean(axis=0)
+        spread = float(np.sqrt((_km(homes, centroid) ** 2).mean()))
+
+        # pairwise preferred-area overlap: share of A's areas near any of B's
+        overlaps, nearest = [], []
+        for i, a in enumerate(users):
+            for j, b in enumerate(users):
+                if i == j:
+                    continue
+                d = _km(a["preferred"][:, None, :], b["preferred"][None, :, :]).min(axis=1)
+                overlaps.append((d <= OVERLAP_KM).mean())
+                nearest.append(d.mean())
+        pref_centroid = np.concatenate([u["preferred"] for u in users]).mean(axis=0)
+
+        vec = np.concatenate([
+            mean_wd, mean_h, joint_wd, joint_h,
+            [ages.mean() / 100.0, ages.std() / 100.0,
+             genders.count("male") / len(users), genders.count("female") / len(users)],
+            (centroid - SEOUL_CENTER) * 10.0,
+            [spread / 10.0],
+            [np.mean(overlaps) if overlaps else 1.0,
+             (np.mean(nearest) if nearest else 0.0) / 10.0,
+             float(_km(centroid, pref_centroid)) / 10.0,
+             len(users) / 10.0],
+        ])
+        return vec.astype(np.float32)
+
+    def features(self, group):
+        """group: iterable of user ids → (FEATURE_DIM,) float32 (cached)."""
+        key = tuple(sorted(str(u) for u in group))
+        vec = self._groups.get(key)
+        if vec is None:
+            vec = self._compute(key)
+            vec.setflags(write=False)
+            if len(self._groups) >= self.max_cache:
+                self._groups.pop(next(iter(self._groups)))
+            self._groups[key] = vec
+        return vec
+
+    def features_batch(self, groups):
+        """list of groups → (B, FEATURE_DIM) float32."""
+        return np.stack([self.features(g) for g in groups])
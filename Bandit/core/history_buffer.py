@@ -1,19 +1,40 @@
 class HistoryBuffer:
     def __init__(self):
         self.history = []   # list of dicts
+        self.offset = 0     # idx of history[0]; earlier entries were dropped (checkpoint tail)
 
-    def log_action(self, global_context, arm_id, arm_context):
+    def log_action(self, global_context, arm_id, arm_context, **extra):
         entry = {
             "G": global_context,
             "arm_id": arm_id,
             "A": arm_context,
             "reward": None
         }
+        # e.g. A_dong for joint (time, dong) actions; None values (an unknown propensity) are not stored
+        entry.update((k, v) for k, v in extra.items() if v is not None)
         self.history.append(entry)
-        return len(self.history) - 1  # index for future reward
+        return self.offset + len(self.history) - 1  # index for future reward
+
+    def restore(self, history, offset=0):
+        """Replace the history with a checkpoint tail whose first entry has idx `offset`."""
+        self.history = list(history)
+        self.offset = offset
+
+    def __contains__(self, entry_idx):
+        """True if entry_idx was handed out and is still in the history."""
+        return self.offset <= entry_idx < self.offset + len(self.history)
+
+    def entry(self, entry_idx):
+        """History entry logged under entry_idx, or None if it was dropped."""
+        i = entry_idx - self.offset
+        return self.history[i] if i >= 0 else None
 
     def set_reward(self, entry_idx, reward):
-        self.history[entry_idx]["reward"] = reward
+        """Returns the rewarded entry, or None if it was dropped."""
+        entry = self.entry(entry_idx)
+        if entry is not None:
+            entry["reward"] = reward
+        return entry
 
     def get_trainable_samples(self):
         return [h for h in self.history if h["reward"] is not None]
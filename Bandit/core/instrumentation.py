@@ -0,0 +1,224 @@
+# bandit/core/instrumentation.py
+"""
+Process-wide span timers, counters and gauges for the recommendation path.
+
+    from bandit.core import instrumentation as instr
+
+    with instr.span("inferencer.rank_arms"):
+        ...
+    instr.count("server.rewards", len(rewards))
+    instr.gauge("server.in_q_depth", in_q.qsize())
+
+    instr.enable()                       # or BANDIT_INSTRUMENTATION=1
+    instr.serve_prometheus(9108)         # GET /metrics → Prometheus text
+    instr.start_json_dumps("metrics.jsonl", interval=10.0)
+
+Disabled (the default) every call is one flag check: span() hands back a
+shared no-op context manager and nothing is recorded.
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# span histogram bucket upper bounds, seconds
+BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, float("inf"))
+
+_enabled = os.environ.get("BANDIT_INSTRUMENTATION", "") not in ("", "0")
+_lock = threading.Lock()
+_spans = {}       # name → [count, total, max, bucket counts]
+_counters = {}
+_gauges = {}
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+        _gauges.clear()
+
+
+# ----------------------------------------------------------------------
+# recording
+# ----------------------------------------------------------------------
+def observe(name, seconds):
+    """Record one duration for span `name` (for waits measured elsewhere)."""
+    if not _enabled:
+        return
+    with _lock:
+        s = _spans.get(name)
+        if s is None:
+            s = _spans[name] = [0, 0.0, 0.0, [0] * len(BUCKETS)]
+        s[0] += 1
+        s[1] += seconds
+        s[2] = max(s[2], seconds)
+        s[3][bisect.bisect_left(BUCKETS, seconds)] += 1
+
+
+def count(name, n=1):
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def gauge(name, value):
+    if not _enabled:
+        return
+    _gauges[name] = value
+
+
+class _Span:
+    __slots__ = ("name", "t0")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self.t0)
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name):
+    """Context manager timing the enclosed block under `name`."""
+    return _Span(name) if _enabled else _NO_SPAN
+
+
+def timed(name):
+    """Decorator form of span()."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ----------------------------------------------------------------------
+# export
+# ----------------------------------------------------------------------
+def snapshot():
+    """Plain-dict copy of everything recorded so far."""
+    with _lock:
+        spans = {
+            name: {
+                "count": c,
+                "total_s": total,
+                "mean_s": total / c if c else 0.0,
+                "max_s": mx,
+                "buckets": {("+Inf" if le == float("inf") else le): n
+                            for le, n in zip(BUCKETS, buckets)},
+            }
+            for name, (c, total, mx, buckets) in _spans.items()
+        }
+        return {"time": time.time(), "spans": spans,
+                "counters": dict(_counters), "gauges": dict(_gauges)}
+
+
+def _metric_name(name):
+    return "bandit_" + "".join(ch if ch.isalnum() else "_" for ch in name)
+
+
+def prometheus_text():
+    """Prometheus text exposition format (spans as histograms)."""
+    snap = snapshot()
+    lines = []
+
+    if snap["spans"]:
+        lines.append("# TYPE bandit_span_seconds histogram")
+    for name, s in sorted(snap["spans"].items()):
+        cumulative = 0
+        for le, n in s["buckets"].items():
+            cumulative += n
+            lines.append(f'bandit_span_seconds_bucket{{span="{name}",le="{le}"}} {cumulative}')
+        lines.append(f'bandit_span_seconds_sum{{span="{name}"}} {s["total_s"]}')
+        lines.append(f'bandit_span_seconds_count{{span="{name}"}} {s["count"]}')
+
+    for name, v in sorted(snap["counters"].items()):
+        metric = _metric_name(name) + "_total"
+        lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric} {v}")
+
+    for name, v in sorted(snap["gauges"].items()):
+        metric = _metric_name(name)
+        lines.append(f"# TYPE {metric} gauge")
+        lines.append(f"{metric} {v}")
+
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_prometheus(port=9108, host="127.0.0.1"):
+    """Serve /metrics on a local port from a daemon thread. Returns the HTTP server."""
+    httpd = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+def start_json_dumps(path, interval=10.0):
+    """
+    Append one snapshot() per interval to `path` (JSON lines) from a daemon
+    thread. Returns a threading.Event; set() it to stop.
+    """
+    stop = threading.Event()
+
+    def loop():
+        while not stop.wait(interval):
+            with open(path, "a") as f:
+                f.write(json.dumps(snapshot()) + "\n")
+
+    threading.Thread(target=loop, daemon=True).start()
+    return stop
@@ -0,0 +1,133 @@
+# bandit/core/preference_env.py
+
+import json
+from pathlib import Path
+
+import numpy as np
+
+from bandit.core.compute_rank_all import compute_rank_all
+
+
+class PreferenceEnvironment:
+    """
+    Ground-truth schedule rewards for simulated friend groups.
+
+    Every user's gold schedule scores (PreferenceScorer.calculate_schedule_scores,
+    or the Person_x_Schedule_Score.json files it writes) are merged per group
+    with compute_rank_all, exactly as DatasetLoader does. Truth is
+    precomputed once for a pool of sampled groups:
+
+        R        (n_groups, n_arms)  reward of each arm for each group
+        contexts (n_groups, d_g)     global context of each group
+
+    so a simulation round is just array indexing.
+
+    reward:
+        "rank"  → 1 - rank / n_arms   (DatasetLoader.reward_from_rank)
+        "score" → the group's average gold score
+
+    Contexts: mean of per-user feature vectors (user_features, or fixed seeded
+    Gaussian vectors of size d_g standing in for the text embedding).
+    """
+
+    def __init__(self, user_cache, arms, group_sizes=(2, 3, 4), n_groups=2000,
+                 d_g=16, user_features=None, reward="rank", seed=0):
+        self.user_cache = user_cache
+        self.user_ids = list(user_cache.keys())
+        self.arms = {k: np.asarray(v, dtype=float) for k, v in arms.items()}
+        self.arm_ids = list(self.arms.keys())
+        self.rng = np.random.default_rng(seed)
+
+        if user_features is None:
+            user_features = {uid: self.rng.standard_normal(d_g) for uid in self.user_ids}
+        self.user_features = {uid: np.asarray(v, dtype=float) for uid, v in user_features.items()}
+
+        self.groups = self._sample_groups(group_sizes, n_groups)
+        self.R = np.stack([self._group_rewards(g, reward) for g in self.groups])
+        self.contexts = np.stack([np.mean([self.user_features[u] for u in g], axis=0)
+                                  for g in self.groups])
+
+        self.best_rows = self.R.argmax(axis=1)
+        self.best_rewards = self.R.max(axis=1)
+
+    # ------------------------------------------------------------------
+    # construction
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_score_dirs(cls, user_ids, dong_score_dir, gu_score_dir, schedule_score_dir,
+                        schedule_arm_path, **kwargs):
+        """Uses the Person_x_*_Score.json files written by process_person()."""
+        def load(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        user_cache = {}
+        for uid in map(str, user_ids):
+            user_cache[uid] = {
+                "dong": load(Path(dong_score_dir) / f"Person_{uid}_Location_Dong_Score.json"),
+                "gu": load(Path(gu_score_dir) / f"Person_{uid}_Location_Gu_Score.json"),
+                "schedule": load(Path(schedule_score_dir) / f"Person_{uid}_Schedule_Score.json"),
+            }
+        return cls(user_cache, load(schedule_arm_path), **kwargs)
+
+    @classmethod
+    def from_scorers(cls, person_ids, schedule_arm_path, **kwargs):
+        """
+        Scores users directly with PreferenceScorer. Like process_all_people.py,
+        run from Scheduling/Gold_Information (PreferenceScorer resolves its data
+        paths from the working directory).
+        """
+        from preference_scorer import PreferenceScorer
+
+        user_cache = {}
+        for pid in person_ids:
+            scorer = PreferenceScorer(pid)
+            user_cache[str(pid)] = {
+                "dong": scorer.calculate_dong_scores(),
+                "gu": scorer.calculate_gu_scores(),
+                "schedule": scorer.calculate_schedule_scores(),
+            }
+        with open(schedule_arm_path, "r", encoding="utf-8") as f:
+            arms = json.load(f)
+        return cls(user_cache, arms, **kwargs)
+
+    def _sample_groups(self, group_sizes, n_groups):
+        sizes = [s for s in group_sizes if 2 <= s <= len(self.user_ids)]
+        groups, seen = [], set()
+        attempts = 0
+        while len(groups) < n_groups and attempts < 20 * n_groups:
+            attempts += 1
+            size = sizes[self.rng.integers(len(sizes))]
+            group = tuple(sorted(self.rng.choice(self.user_ids, size=size, replace=False)))
+            if group not in seen:
+                seen.add(group)
+                groups.append(list(group))
+        return groups
+
+    def _group_rewards(self, group, reward):
+        sched_rank = compute_rank_all(group, self.user_cache)["schedule_rank"]
+        out = np.zeros(len(self.arm_ids))
+        position = {row["schedule"]: i for i, row in enumerate(sched_rank)}
+        for j, arm_key in enumerate(self.arm_ids):
+            i = position.get(arm_key)
+            if i is None:
+                continue
+            if reward == "rank":
+                out[j] = 1 - i / len(sched_rank)
+            else:
+                out[j] = sched_rank[i]["average_score"]
+        return out
+
+    # ------------------------------------------------------------------
+    # sampling
+    # ------------------------------------------------------------------
+    def sample(self, batch_size):
+        """Returns (group rows (B,), contexts (B, d_g))."""
+        rows = self.rng.integers(len(self.groups), size=batch_size)
+        return rows, self.contexts[rows]
+
+    def rewards(self, group_rows, arm_rows, noise=0.0):
+        r = self.R[group_rows, arm_rows]
+        if noise:
+            r = r + self.rng.normal(0.0, noise, size=r.shape)
+        return r
@@ -0,0 +1,139 @@
+# bandit/core/tenant_registry.py
+
+import threading
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from urllib.parse import quote
+
+from bandit.bandit import ContextualBandit
+from bandit.core.checkpoint import save_checkpoint, load_checkpoint
+from bandit.inference.inferencer import Inferencer
+from bandit.models.residual_model import ResidualLinearModel
+
+
+class TenantRegistry:
+    """
+    One lightweight bandit per friend group / user, sharing a base model.
+
+    Each tenant owns a ResidualLinearModel (float32 residual over base.M) and
+    its own HistoryBuffer; arms and the arm matrix are shared. At most
+    max_tenants stay in memory: the least-recently-used one is checkpointed to
+    checkpoint_dir on eviction and restored lazily on its next request. The
+    checkpoint keeps the history tail and its idx offset, so idx handed out
+    before the eviction still reach the right entry after the restore.
+
+    Tenants held through use() are never evicted. A bandit obtained with
+    get() and still referenced after its eviction is not replaced by a copy
+    from disk: the next get() brings the same object back, and flush() saves
+    it, so rewards applied to it in between are kept.
+    """
+
+    def __init__(self, base_model, arms, checkpoint_dir, max_tenants=128,
+                 global_provider=None, lr=0.01):
+        self.base_model = base_model
+        self.arms = arms
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        self.max_tenants = max_tenants
+        self.global_provider = global_provider
+        self.lr = lr
+
+        d_g, d_a = base_model.M.shape
+        self.d_g, self.d_a = d_g, d_a
+
+        # template inferencer: tenants share its arm matrix / index
+        self._shared = Inferencer(arms, base_model)
+
+        self._tenants = OrderedDict()   # tenant_id → ContextualBandit, LRU order
+        self._in_use = {}               # tenant_id → number of open use() blocks
+        self._evicted = weakref.WeakValueDictionary()   # evicted, still referenced elsewhere
+        self._lock = threading.Lock()
+
+        self.metrics = {"created": 0, "restored": 0, "evicted": 0}
+
+    def _path(self, tenant_id):
+        return self.checkpoint_dir / f"tenant_{quote(str(tenant_id), safe='')}"
+
+    def _new_bandit(self, model):
+        return ContextualBandit(self.global_provider, self.arms, model,
+                                inferencer=self._shared.with_model(model))
+
+    def _load_or_create(self, tenant_id):
+        bandit = self._evicted.pop(tenant_id, None)
+        if bandit is not None:
+            # still alive (and possibly rewarded) since its eviction: newer than the checkpoint
+            self.metrics["restored"] += 1
+            return bandit
+
+        model = ResidualLinearModel(self.d_g, self.d_a, lr=self.lr, base=self.base_model)
+        bandit = self._new_bandit(model)
+
+        path = self._path(tenant_id)
+        if path.exists():
+            ckpt = load_checkpoint(path, model=model)
+            bandit.buffer.restore(ckpt["history"], ckpt["history_offset"])
+            self.metrics["restored"] += 1
+        else:
+            self.metrics["created"] += 1
+        return bandit
+
+    def _save(self, tenant_id, bandit):
+        save_checkpoint(self._path(tenant_id), bandit.model, buffer=bandit.buffer)
+
+    def _evict(self):
+        """Checkpoint and drop least-recently-used tenants that are not in use."""
+        for tenant_id in list(self._tenants):
+            if len(self._tenants) <= self.max_tenants:
+                break
+            if self._in_use.get(tenant_id):
+                continue
+            bandit = self._tenants.pop(tenant_id)
+            self._save(tenant_id, bandit)
+            self._evicted[tenant_id] = bandit
+            self.metrics["evicted"] += 1
+
+    def get(self, tenant_id):
+        """ContextualBandit for this tenant (created or restored on demand)."""
+        with self._lock:
+            bandit = self._tenants.get(tenant_id)
+            if bandit is not None:
+                self._tenants.move_to_end(tenant_id)
+                return bandit
+
+            bandit = self._load_or_create(tenant_id)
+            self._tenants[tenant_id] = bandit
+            self._evict()
+            return bandit
+
+    @contextmanager
+    def use(self, tenant_id):
+        """
+        with registry.use(tenant_id) as bandit: ...   — the tenant is pinned
+        (never evicted) until the block ends, e.g. across infer → reward.
+        """
+        with self._lock:
+            self._in_use[tenant_id] = self._in_use.get(tenant_id, 0) + 1
+        try:
+            yield self.get(tenant_id)
+        finally:
+            with self._lock:
+                self._in_use[tenant_id] -= 1
+                if not self._in_use[tenant_id]:
+                    del self._in_use[tenant_id]
+                self._evict()
+
+    def flush(self):
+        """Checkpoint every in-memory tenant (e.g. before shutdown)."""
+        with self._lock:
+            for tenant_id, bandit in self._tenants.items():
+                self._save(tenant_id, bandit)
+            for tenant_id, bandit in list(self._evicted.items()):
+                self._save(tenant_id, bandit)
+
+    def __contains__(self, tenant_id):
+        return tenant_id in self._tenants
+
+    def __len__(self):
+        return len(self._tenants)
@@ -0,0 +1,157 @@
+# bandit/evaluation/off_policy.py
+
+import numpy as np
+
+from bandit.inference.inferencer import Inferencer
+
+
+def _softmax(scores, temperature):
+    z = scores / temperature
+    z = z - z.max(axis=-1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+class OffPolicyEvaluator:
+    """
+    Replays logged bandit data against candidate policies.
+
+    Logs are stacked once into arrays:
+        G (N, d_g)   contexts
+        a (N,)       logged arm row
+        r (N,)       observed rewards
+        p (N,)       logging propensity of a (probability the logger picked it)
+
+    A candidate policy is any model with score_batch(); it is scored on all N
+    logged contexts x all arms in one batched call and turned into action
+    probabilities pi (N, n_arms) (greedy by default, softmax if temperature).
+
+    Estimators (value of the candidate policy), each with a normal CI:
+        IPS    mean(w r),                 w = pi(a|x) / p
+        SNIPS  sum(w r) / sum(w)
+        DR     mean(sum_a pi(a|x) q(x,a) + w (r - q(x,a)))   (needs reward_model)
+    """
+
+    def __init__(self, arms, G, arm_rows, rewards, propensities):
+        self.arms = Inferencer(arms, model=None)
+        self.G = np.asarray(G, dtype=float)
+        self.a = np.asarray(arm_rows, dtype=int)
+        self.r = np.asarray(rewards, dtype=float)
+        self.p = np.asarray(propensities, dtype=float)
+
+    # ------------------------------------------------------------------
+    # log sources
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_history(cls, arms, history):
+        """
+        history: HistoryBuffer.history (or a checkpoint history tail).
+        Only rewarded entries with a logged propensity are used.
+        """
+        index = {arm_id: i for i, arm_id in enumerate(arms)}
+        rows = [h for h in history
+                if h["reward"] is not None and "propensity" in h and h["arm_id"] in index]
+        return cls(
+            arms,
+            [h["G"] for h in rows],
+            [index[h["arm_id"]] for h in rows],
+            [h["reward"] for h in rows],
+            [h["propensity"] for h in rows],
+        )
+
+    @classmethod
+    def from_dataset(cls, arms, dataset):
+        """
+        dataset: DatasetLoader.load() output. Every arm is enumerated for every
+        group, i.e. a uniform logger → propensity = 1 / n_arms.
+        """
+        index = {arm_id: i for i, arm_id in enumerate(arms)}
+        rows = [s for s in dataset if s["chosen_arm"] in index]
+        return cls(
+            arms,
+            [s["global_context"] for s in rows],
+            [index[s["chosen_arm"]] for s in rows],
+            [s["reward"] for s in rows],
+            np.full(len(rows), 1.0 / len(index)),
+        )
+
+    # ------------------------------------------------------------------
+    # policies
+    # ------------------------------------------------------------------
+    def action_probs(self, scores, temperature=None):
+        """scores (..., N, n_arms) → pi (..., N, n_arms)"""
+        if temperature:
+            return _softmax(scores, temperature)
+        pi = np.zeros_like(scores)
+        np.put_along_axis(pi, scores.argmax(axis=-1)[..., None], 1.0, axis=-1)
+        return pi
+
+    def _estimate(self, pi, q=None, z=1.96):
+        """pi: (N, n_arms) action probabilities of the candidate policy."""
+        n = len(self.r)
+        w = pi[np.arange(n), self.a] / self.p
+        wr = w * self.r
+
+        ips = wr.mean()
+        w_mean = w.mean()
+        snips = wr.sum() / w.sum() if w.sum() > 0 else 0.0
+        snips_se = np.sqrt(np.mean((w * (self.r - snips)) ** 2) / n) / w_mean if w_mean > 0 else 0.0
+
+        result = {
+            "n": n,
+            "ips": float(ips),
+            "ips_ci": (float(ips - z * wr.std() / np.sqrt(n)), float(ips + z * wr.std() / np.sqrt(n))),
+            "snips": float(snips),
+            "snips_ci": (float(snips - z * snips_se), float(snips + z * snips_se)),
+            "dr": None,
+            "dr_ci": None,
+        }
+
+        if q is not None:
+            dr_terms = (pi * q).sum(axis=1) + w * (self.r - q[np.arange(n), self.a])
+            dr = dr_terms.mean()
+            half = z * dr_terms.std() / np.sqrt(n)
+            result["dr"] = float(dr)
+            result["dr_ci"] = (float(dr - half), float(dr + half))
+        return result
+
+    def evaluate(self, policies, reward_model=None, temperature=None, z=1.96):
+        """
+        policies: dict {name: model}
+        reward_model: model whose score() estimates the reward (for DR), e.g. a
+                      LinearModel fitted with fit_closed_form on the same logs
+        Returns: dict {name: estimates}
+        """
+        if len(self.r) == 0:
+            return {name: None for name in policies}
+
+        q = None
+        if reward_model is not None:
+            q = np.asarray(reward_model.score_batch(self.G, self.arms.arm_matrix), dtype=float)
+
+        results = {}
+        for name, model in policies.items():
+            scores = np.asarray(model.score_batch(self.G, self.arms.arm_matrix), dtype=float)
+            results[name] = self._estimate(self.action_probs(scores, temperature), q, z)
+        return results
+
+    def evaluate_bilinear_grid(self, Ms, names=None, reward_model=None, temperature=None, z=1.96):
+        """
+        Hyper-parameter grid of bilinear policies in one pass.
+
+        Ms: (P, d_g, d_a) stacked weight matrices (e.g. LinearModel.M trained
+            with different lr / lam); scores for every policy, log and arm come
+            from a single einsum + matmul.
+        """
+        Ms = np.asarray(Ms, dtype=float)
+        names = names or [f"policy_{i}" for i in range(len(Ms))]
+        if len(self.r) == 0:
+            return {name: None for name in names}
+
+        q = None
+        if reward_model is not None:
+            q = np.asarray(reward_model.score_batch(self.G, self.arms.arm_matrix), dtype=float)
+
+        scores = np.einsum("nd,pde->pne", self.G, Ms) @ self.arms.arm_matrix.T   # (P, N, n_arms)
+        pis = self.action_probs(scores, temperature)
+        return {name: self._estimate(pi, q, z) for name, pi in zip(names, pis)}
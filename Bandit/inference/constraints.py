@@ -0,0 +1,260 @@
+# bandit/inference/constraints.py
+"""
+Arm constraints compiled to boolean masks over ArmRegistry metadata.
+
+    where = weekend() & hour_at_least(18) & in_gu("강남구", "서초구")
+    where = parse("weekend & hour >= 18 & gu in [강남구, 서초구]")
+    where = parse("date >= 2025-12-06 & date <= 2025-12-13 & !id in [2025-12-06-18]")
+
+    mask = where.mask(registry)          # (n_arms,) bool, cached per registry
+    inferencer.rank_where(G, where, k=3)
+
+Leaf masks are vectorized comparisons on metadata columns; & | ~ combine
+masks with numpy. Every node has a hashable key, so a mask is computed once
+per registry snapshot (a hot reload brings a new registry, hence a fresh
+cache).
+"""
+
+import re
+from collections import OrderedDict
+
+import numpy as np
+
+MASK_CACHE_SIZE = 256
+
+
+class Constraint:
+    def __init__(self, key, fn):
+        self.key = key
+        self._fn = fn             # registry → bool mask
+
+    def mask(self, registry):
+        cache = registry.__dict__.setdefault("_mask_cache", OrderedDict())
+        hit = cache.get(self.key)
+        if hit is not None:
+            cache.move_to_end(self.key)
+            return hit
+
+        mask = np.asarray(self._fn(registry), dtype=bool)
+        mask.setflags(write=False)
+        cache[self.key] = mask
+        while len(cache) > MASK_CACHE_SIZE:
+            cache.popitem(last=False)
+        return mask
+
+    def __and__(self, other):
+        return Constraint(("and", self.key, other.key),
+                          lambda r: self.mask(r) & other.mask(r))
+
+    def __or__(self, other):
+        return Constraint(("or", self.key, other.key),
+                          lambda r: self.mask(r) | other.mask(r))
+
+    def __invert__(self):
+        return Constraint(("not", self.key), lambda r: ~self.mask(r))
+
+    def __repr__(self):
+        return f"Constraint{self.key}"
+
+
+# ----------------------------------------------------------------------
+# leaves
+# ----------------------------------------------------------------------
+def _weekday(registry):
+    # 1970-01-01 was a Thursday → Monday == 0
+    days = registry.metadata["date"].astype("int64")
+    return (days + 3) % 7
+
+
+def _has_date(registry):
+    return ~np.isnat(registry.metadata["date"])
+
+
+def everything():
+    return Constraint(("all",), lambda r: np.ones(len(r), dtype=bool))
+
+
+def weekend():
+    return Constraint(("weekend",), lambda r: _has_date(r) & (_weekday(r) >= 5))
+
+
+def weekdays():
+    return Constraint(("weekdays",), lambda r: _has_date(r) & (_weekday(r) < 5))
+
+
+def hour_at_least(h):
+    return Constraint(("hour>=", h), lambda r: r.metadata["hour"] >= h)
+
+
+def hour_before(h):
+    return Constraint(("hour<", h), lambda r: (r.metadata["hour"] >= 0) & (r.metadata["hour"] < h))
+
+
+def date_between(start, end):
+    """Inclusive date range; start / end as 'YYYY-MM-DD' or datetime.date."""
+    lo, hi = np.datetime64(start, "D"), np.datetime64(end, "D")
+    return Constraint(("date", str(lo), str(hi)),
+                      lambda r: _has_date(r) & (r.metadata["date"] >= lo) & (r.metadata["date"] <= hi))
+
+
+def in_gu(*gus):
+    gus = frozenset(gus)
+    return Constraint(("gu", gus), lambda r: np.isin(r.metadata["gu"], list(gus)))
+
+
+def in_dong(*dongs):
+    dongs = frozenset(dongs)
+    return Constraint(("dong", dongs), lambda r: np.isin(r.metadata["dong"], list(dongs)))
+
+
+def arm_ids(ids):
+    """Arms whose id is in ids; ~arm_ids(booked) excludes already-booked slots."""
+    ids = frozenset(ids)
+
+    def fn(r):
+        mask = np.zeros(len(r), dtype=bool)
+        mask[[r.index[a] for a in ids if a in r.index]] = True
+        return mask
+    return Constraint(("id", ids), fn)
+
+
+def exclude(ids):
+    return ~arm_ids(ids)
+
+
+# ----------------------------------------------------------------------
+# text form
+# ----------------------------------------------------------------------
+_OPERATORS = (">=", ">", "<", "<=", "==")
+_TOKEN = re.compile(r"\s*(>=|<=|==|[&|!()\[\],<>]|[^\s&|!()\[\],<>=]+)")
+
+
+def _tokenize(text):
+    tokens, pos = [], 0
+    text = text.strip()
+    while pos < len(text):
+        m = _TOKEN.match(text, pos)
+        if m is None:
+            raise ValueError(f"bad constraint near {text[pos:]!r}")
+        tokens.append(m.group(1))
+        pos = m.end()
+    return tokens
+
+
+class _Parser:
+    """
+    expr   := term ("|" term)*
+    term   := factor ("&" factor)*
+    factor := "!" factor | "(" expr ")" | atom
+    atom   := weekend | weekday | all
+            | hour (>=|>|<|<=|==) INT
+            | date (>=|>|<|<=|==) YYYY-MM-DD
+            | (gu|dong|id) in "[" name ("," name)* "]"
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def take(self, expected=None):
+        tok = self.peek()
+        if tok is None or (expected is not None and tok != expected):
+            raise ValueError(f"expected {expected or 'token'}, got {tok!r}")
+        self.pos += 1
+        return tok
+
+    def expr(self):
+        node = self.term()
+        while self.peek() == "|":
+            self.take()
+            node = node | self.term()
+        return node
+
+    def term(self):
+        node = self.factor()
+        while self.peek() == "&":
+            self.take()
+            node = node & self.factor()
+        return node
+
+    def factor(self):
+        tok = self.peek()
+        if tok == "!":
+            self.take()
+            return ~self.factor()
+        if tok == "(":
+            self.take()
+            node = self.expr()
+            self.take(")")
+            return node
+        return self.atom()
+
+    def names(self):
+        self.take("[")
+        names = [self.take()]
+        while self.peek() == ",":
+            self.take()
+            names.append(self.take())
+        self.take("]")
+        return names
+
+    def op(self):
+        tok = self.take()
+        if tok not in _OPERATORS:
+            raise ValueError(f"unknown operator {tok!r}")
+        return tok
+
+    def atom(self):
+        word = self.take()
+        if word in ("weekend", "weekends"):
+            return weekend()
+        if word in ("weekday", "weekdays"):
+            return weekdays()
+        if word == "all":
+            return everything()
+        if word in ("gu", "dong", "id"):
+            self.take("in")
+            names = self.names()
+            return {"gu": lambda: in_gu(*names), "dong": lambda: in_dong(*names),
+                    "id": lambda: arm_ids(names)}[word]()
+        if word == "hour":
+            op, h = self.op(), int(self.take())
+            return {">=": lambda: hour_at_least(h), ">": lambda: hour_at_least(h + 1),
+                    "<": lambda: hour_before(h), "<=": lambda: hour_before(h + 1),
+                    "==": lambda: hour_at_least(h) & hour_before(h + 1)}[op]()
+        if word == "date":
+            op, d = self.op(), np.datetime64(self.take(), "D")
+            one = np.timedelta64(1, "D")
+            lo, hi = np.datetime64("1900-01-01"), np.datetime64("2999-12-31")
+            bounds = {">=": (d, hi), ">": (d + one, hi), "<=": (lo, d), "<": (lo, d - one),
+                      "==": (d, d)}[op]
+            return date_between(*bounds)
+        raise ValueError(f"unknown constraint {word!r}")
+
+
+_parsed = {}
+
+
+def parse(text):
+    """Text → Constraint (parsed constraints are cached by text)."""
+    node = _parsed.get(text)
+    if node is None:
+        parser = _Parser(_tokenize(text))
+        node = parser.expr()
+        if parser.peek() is not None:
+            raise ValueError(f"unexpected {parser.peek()!r} in constraint {text!r}")
+        if len(_parsed) < MASK_CACHE_SIZE:
+            _parsed[text] = node
+    return node
+
+
+def as_mask(where, registry):
+    """Constraint, constraint text or a ready bool mask → (n_arms,) bool mask."""
+    if isinstance(where, str):
+        where = parse(where)
+    if isinstance(where, Constraint):
+        return where.mask(registry)
+    return np.asarray(where, dtype=bool)
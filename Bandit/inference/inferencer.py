@@ -1,61 +1,184 @@
 import numpy as np
 
+from bandit.core import instrumentation as instr
+from bandit.core.arm_registry import ArmRegistry
+from bandit.inference.constraints import as_mask
+
 class Inferencer:
-    def __init__(self, arms, model):
-        self.arms = arms
+    def __init__(self, arms, model, index=None):
+        """
+        index: optional MIPS index (ExactMIPSIndex / IVFMIPSIndex) over the arm
+               matrix. Used by get_top_k when the model exposes query_vector(G),
+               i.e. score(G, A) == query_vector(G) @ A.
+        """
         self.model = model
+        self.index = index
+        self.set_arms(arms)
+
+    def set_arms(self, arms, rebuild_index=True):
+        """
+        (Re)build the stacked arm matrix.
+
+        arms: dict {arm_id: vector} or ArmRegistry (its float32 matrix is used
+              as is). Row i of arm_matrix belongs to arm_ids[i]; ties between
+              equal scores go to the lower row (for schedule registries: the
+              earlier date).
+        rebuild_index: refresh the MIPS index now (False → call rebuild_index() later;
+                       until then get_top_k scores exhaustively)
+
+        Identical arm vectors (e.g. every plain Monday 19h) are scored once:
+        unique_matrix holds the distinct rows, arm_inverse maps each arm row
+        to its unique row (None when every row is distinct).
+        """
+        self.arms = arms
+        if isinstance(arms, ArmRegistry):
+            self.arm_ids = arms.ids
+            self.arm_index = arms.index
+            self.arm_matrix = arms.matrix
+            unique, inverse = arms.unique()
+        else:
+            self.arm_ids = list(arms.keys())
+            self.arm_index = {arm_id: i for i, arm_id in enumerate(self.arm_ids)}
+            if self.arm_ids:
+                self.arm_matrix = np.stack([np.asarray(arms[a], dtype=float) for a in self.arm_ids])
+                unique, inverse = np.unique(self.arm_matrix, axis=0, return_inverse=True)
+            else:
+                self.arm_matrix = np.empty((0, 0))
+                unique, inverse = self.arm_matrix, np.empty(0, dtype=int)
+
+        if len(unique) < len(self.arm_ids):
+            self.unique_matrix, self.arm_inverse = unique, inverse.reshape(-1)
+        else:
+            self.unique_matrix, self.arm_inverse = None, None
+
+        self.index_stale = True          # index (if any) still describes the previous arms
+        if rebuild_index:
+            self.rebuild_index()
+
+    def with_model(self, model):
+        """Inferencer for another model that shares this one's arm matrix and index."""
+        other = object.__new__(Inferencer)
+        other.__dict__.update(self.__dict__)
+        other.model = model
+        return other
+
+    def rebuild_index(self):
+        """Re-index the current arm matrix (arms changed). Model updates need no rebuild."""
+        if self.index is not None and len(self.arm_ids):
+            self.index.build(self.arm_matrix)
+            self.index_stale = False
+
+    def _use_index(self):
+        return (self.index is not None
+                and not self.index_stale
+                and hasattr(self.model, "query_vector"))
+
+    def score_all(self, G, rows=None):
+        """
+        Score all arms (or only `rows`) in one call.
+
+        G: (d_g,) → (n_arms,) scores, or (B, d_g) → (B, n_arms) scores
+        """
+        if self.arm_inverse is None:
+            arm_matrix = self.arm_matrix if rows is None else self.arm_matrix[rows]
+            return np.asarray(self.model.score_batch(G, arm_matrix), dtype=float)
 
+        # score each distinct arm vector once, then broadcast back to arm rows
+        if rows is None:
+            unique, inverse = self.unique_matrix, self.arm_inverse
+        else:
+            used, inverse = np.unique(self.arm_inverse[rows], return_inverse=True)
+            unique = self.unique_matrix[used]
+        scores = np.asarray(self.model.score_batch(G, unique), dtype=float)
+        return scores[..., inverse]
+
+    def _rank_rows(self, scores, rows, k=None):
+        """
+        scores: (n,) scores for arm rows `rows`
+        returns list of (arm_id, score) sorted by score descending (ties → arm order)
+        """
+        n = len(scores)
+        if k is not None and k < n:
+            if k <= 0:
+                return []
+            # everything tied with the k-th score competes, so ties go to the lower row
+            kth = -np.partition(-scores, k - 1)[k - 1]
+            top = np.flatnonzero(scores >= kth)
+            order = top[np.lexsort((top, -scores[top]))][:k]
+        else:
+            order = np.argsort(-scores, kind="stable")
+        return [(self.arm_ids[rows[i]], float(scores[i])) for i in order]
+
+    def _rank(self, G, rows, k=None):
+        scores = self.score_all(G, rows)
+        if scores.ndim == 1:
+            return self._rank_rows(scores, rows, k)
+        return [self._rank_rows(s, rows, k) for s in scores]
+
+    @instr.timed("inferencer.select_arm")
     def select_arm(self, G):
-        scores = {}
-        for arm_id, A in self.arms.items():
-            scores[arm_id] = self.model.score(G, A)
-        return max(scores, key=scores.get)
-    
+        """
+        G: (d_g,) → arm_id, or (B, d_g) → list of arm_ids
+        """
+        scores = self.score_all(G)
+        best = np.argmax(scores, axis=-1)
+        if scores.ndim == 1:
+            return self.arm_ids[int(best)]
+        return [self.arm_ids[int(i)] for i in best]
+
+    @instr.timed("inferencer.rank_arms")
     def rank_arms(self, G):
         """
         Return full ranking of all arms from best to worst.
-        
+
         Returns:
             ranked_arms: list of (arm_id, score) tuples sorted by score descending
+            (a list of such lists when G is a batch of contexts)
         """
-        scores = {}
-        for arm_id, A in self.arms.items():
-            scores[arm_id] = self.model.score(G, A)
-        
-        # Sort by score descending
-        ranked_arms = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-        return ranked_arms
-    
+        return self._rank(G, np.arange(len(self.arm_ids)))
+
+    @instr.timed("inferencer.get_top_k")
     def get_top_k(self, G, k=3):
         """
         Get top k arms.
-        
+
         Returns:
             list of (arm_id, score) tuples for top k arms
         """
-        ranked = self.rank_arms(G)
-        return ranked[:k]
-    
+        if self._use_index():
+            hits = self.index.search(self.model.query_vector(G), k)
+            if np.ndim(G) == 1:
+                hits = [hits]
+            ranked = [[(self.arm_ids[r], float(sc)) for r, sc in zip(rows, scores)]
+                      for rows, scores in hits]
+            return ranked[0] if np.ndim(G) == 1 else ranked
+        return self._rank(G, np.arange(len(self.arm_ids)), k)
+
+    @instr.timed("inferencer.filter_and_rank")
     def filter_and_rank(self, G, filter_fn, k=None):
         """
         Filter arms and return ranking.
-        
+
         Args:
-            G: global context
+            G: global context (d_g,) or batch of contexts (B, d_g)
             filter_fn: function that takes arm_id and returns True to include
             k: if specified, return only top k
-            
+
         Returns:
             list of (arm_id, score) tuples
         """
-        scores = {}
-        for arm_id, A in self.arms.items():
-            if filter_fn(arm_id):
-                scores[arm_id] = self.model.score(G, A)
-        
-        ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-        
-        if k is not None:
-            ranked = ranked[:k]
-            
-        return ranked
\ No newline at end of file
+        mask = np.fromiter((bool(filter_fn(a)) for a in self.arm_ids), dtype=bool, count=len(self.arm_ids))
+        return self._rank(G, np.flatnonzero(mask), k)
+
+    @instr.timed("inferencer.rank_where")
+    def rank_where(self, G, where, k=None):
+        """
+        filter_and_rank without a per-arm Python call.
+
+        where: Constraint, constraint text ("weekend & hour >= 18") or a bool
+               mask over arm rows. Constraints need an ArmRegistry (metadata);
+               their masks are cached on it.
+        """
+        if not isinstance(where, np.ndarray) and not isinstance(self.arms, ArmRegistry):
+            raise TypeError("constraints need arms loaded as an ArmRegistry")
+        return self._rank(G, np.flatnonzero(as_mask(where, self.arms)), k)
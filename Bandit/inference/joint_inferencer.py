@@ -0,0 +1,149 @@
+# bandit/inference/joint_inferencer.py
+
+import heapq
+import numpy as np
+
+from bandit.inference.inferencer import Inferencer
+
+
+class LowRankInteraction:
+    """
+    Optional (time, dong) interaction term:
+
+        h(G, t, d) = sum_r (A_t @ U)[r] * (G @ W)[r] * (A_d @ V)[r]
+
+    Rank r keeps it cheap; |h| is bounded by max_t ||(A_t U) ∘ (G W)|| * max_d ||A_d V||,
+    which is what lets the top-k merge stop early.
+    """
+
+    def __init__(self, d_g, d_t, d_d, rank=4, lr=0.01):
+        self.U = np.random.randn(d_t, rank) * 0.1
+        self.V = np.random.randn(d_d, rank) * 0.1
+        self.W = np.random.randn(d_g, rank) * 0.1
+        self.lr = lr
+
+    def factors(self, G, time_matrix, dong_matrix):
+        c = np.asarray(G) @ self.W
+        P = (time_matrix @ self.U) * c      # (n_t, r), context folded in
+        Q = dong_matrix @ self.V            # (n_d, r)
+        return P, Q
+
+    def score(self, G, A_t, A_d):
+        return float(np.sum((A_t @ self.U) * (np.asarray(G) @ self.W) * (A_d @ self.V)))
+
+    def update(self, G, A_t, A_d, grad):
+        G = np.asarray(G)
+        p, c, q = A_t @ self.U, G @ self.W, A_d @ self.V
+        self.U -= self.lr * grad * np.outer(A_t, c * q)
+        self.V -= self.lr * grad * np.outer(A_d, p * c)
+        self.W -= self.lr * grad * np.outer(G, p * q)
+
+
+class JointInferencer:
+    """
+    Ranks (time slot, dong) pairs with a factorized score
+
+        score(G, t, d) = f(G, t) + g(G, d) [+ h(G, t, d)]
+
+    f = time_model over time arms, g = dong_model over dong arms. Each side is
+    scored once with its own Inferencer (n_t + n_d scores, not n_t * n_d) and the
+    top-k pairs come out of a heap merge over the two sorted score lists.
+    """
+
+    def __init__(self, time_arms, dong_arms, time_model, dong_model, interaction=None):
+        self.time = Inferencer(time_arms, time_model)
+        self.dong = Inferencer(dong_arms, dong_model)
+        self.interaction = interaction
+
+    def with_models(self, time_model, dong_model, interaction=None):
+        """JointInferencer over the same arm matrices with other models (trainer snapshots)."""
+        other = object.__new__(JointInferencer)
+        other.time = self.time.with_model(time_model)
+        other.dong = self.dong.with_model(dong_model)
+        other.interaction = interaction
+        return other
+
+    def top_k_pairs(self, G, k=3):
+        """
+        Returns:
+            list of ((time_id, dong_id), score) sorted by score descending
+        """
+        f = self.time.score_all(G)
+        g = self.dong.score_all(G)
+        n_t, n_d = len(f), len(g)
+        k = min(k, n_t * n_d)
+        if k <= 0:
+            return []
+
+        t_order = np.argsort(-f, kind="stable")
+        d_order = np.argsort(-g, kind="stable")
+        f_sorted, g_sorted = f[t_order], g[d_order]
+
+        if self.interaction is not None:
+            P, Q = self.interaction.factors(G, self.time.arm_matrix, self.dong.arm_matrix)
+            bound = np.linalg.norm(P, axis=1).max() * np.linalg.norm(Q, axis=1).max()
+        else:
+            P = Q = None
+            bound = 0.0
+
+        # frontier over the (i, j) grid of sorted positions, largest f+g first
+        frontier = [(-(f_sorted[0] + g_sorted[0]), 0, 0)]
+        seen = {(0, 0)}
+        best = []   # min-heap of (score, i, j) holding the current top-k
+
+        while frontier:
+            neg_add, i, j = heapq.heappop(frontier)
+            additive = -neg_add
+
+            # threshold: nothing left on the frontier can beat the k-th best
+            if len(best) == k and additive + bound <= best[0][0]:
+                break
+
+            t, d = t_order[i], d_order[j]
+            total = additive if P is None else additive + float(P[t] @ Q[d])
+            if len(best) < k:
+                heapq.heappush(best, (total, i, j))
+            elif total > best[0][0]:
+                heapq.heapreplace(best, (total, i, j))
+
+            for ni, nj in ((i + 1, j), (i, j + 1)):
+                if ni < n_t and nj < n_d and (ni, nj) not in seen:
+                    seen.add((ni, nj))
+                    heapq.heappush(frontier, (-(f_sorted[ni] + g_sorted[nj]), ni, nj))
+
+        best.sort(key=lambda x: (-x[0], x[1], x[2]))
+        return [((self.time.arm_ids[t_order[i]], self.dong.arm_ids[d_order[j]]), float(s))
+                for s, i, j in best]
+
+    def score(self, G, A_t, A_d):
+        total = self.time.model.score(G, A_t) + self.dong.model.score(G, A_d)
+        if self.interaction is not None:
+            total += self.interaction.score(G, A_t, A_d)
+        return total
+
+    def update(self, samples):
+        """
+        Backfitting on joint rewards: each side is trained on the reward minus
+        the other parts' current prediction, through its own update().
+
+        samples: buffer entries with "G", "A" (time vector), "A_dong", "reward"
+        """
+        if len(samples) == 0:
+            return
+
+        time_samples, dong_samples = [], []
+        for s in samples:
+            G, A_t, A_d, r = s["G"], s["A"], s["A_dong"], s["reward"]
+            f = self.time.model.score(G, A_t)
+            g = self.dong.model.score(G, A_d)
+            h = self.interaction.score(G, A_t, A_d) if self.interaction is not None else 0.0
+
+            time_samples.append({"G": G, "A": A_t, "reward": r - g - h})
+            dong_samples.append({"G": G, "A": A_d, "reward": r - f - h})
+
+            if self.interaction is not None:
+                grad = np.clip(f + g + h - r, -3, 3)
+                self.interaction.update(G, A_t, A_d, grad)
+
+        self.time.model.update(time_samples)
+        self.dong.model.update(dong_samples)
@@ -0,0 +1,136 @@
+# bandit/inference/mips_index.py
+
+import numpy as np
+
+
+def _merge_top_k(rows, scores, new_rows, new_scores, k):
+    """Keep the k best (row, score) pairs out of the current top-k and a new block."""
+    rows = np.concatenate([rows, new_rows])
+    scores = np.concatenate([scores, new_scores])
+    if len(scores) > k:
+        keep = np.lexsort((rows, -scores))[:k]      # ties at the boundary → lower row
+        rows, scores = rows[keep], scores[keep]
+    return rows, scores
+
+
+def _sorted(rows, scores):
+    order = np.lexsort((rows, -scores))
+    return rows[order], scores[order]
+
+
+class ExactMIPSIndex:
+    """
+    Exact maximum-inner-product search over arm rows.
+
+    Arms are sorted by norm and split into blocks. A block can only contain a
+    score up to ||q|| * (largest norm in the block) (Cauchy–Schwarz), so blocks
+    are scanned in descending norm order and the scan stops as soon as that
+    bound can no longer beat the current k-th best score.
+    """
+
+    def __init__(self, block_size=1024):
+        self.block_size = block_size
+        self.size = 0
+
+    def build(self, arm_matrix):
+        arm_matrix = np.asarray(arm_matrix, dtype=float)
+        norms = np.linalg.norm(arm_matrix, axis=1)
+        order = np.argsort(-norms, kind="stable")
+
+        self.size = len(arm_matrix)
+        self.rows = order                                  # position → original row
+        self.matrix = arm_matrix[order]
+        self.block_starts = np.arange(0, self.size, self.block_size)
+        self.block_bounds = norms[order][self.block_starts]   # max norm per block
+        return self
+
+    def _search_one(self, q, k):
+        q_norm = np.linalg.norm(q)
+        rows = np.empty(0, dtype=int)
+        scores = np.empty(0)
+
+        for start, bound in zip(self.block_starts, self.block_bounds):
+            if len(scores) == k and q_norm * bound < scores.min():
+                break   # no later block can enter the top-k
+            end = start + self.block_size
+            block_scores = self.matrix[start:end] @ q
+            rows, scores = _merge_top_k(rows, scores, self.rows[start:end], block_scores, k)
+
+        return _sorted(rows, scores)
+
+    def search(self, q, k):
+        """
+        q: (d_a,) → (rows (k,), scores (k,)) best first
+           (B, d_a) → list of such pairs
+        """
+        k = min(k, self.size)
+        q = np.asarray(q, dtype=float)
+        if k <= 0:
+            empty = (np.empty(0, dtype=int), np.empty(0))
+            return empty if q.ndim == 1 else [empty] * len(q)
+        if q.ndim == 1:
+            return self._search_one(q, k)
+        return [self._search_one(qi, k) for qi in q]
+
+
+class IVFMIPSIndex:
+    """
+    Approximate MIPS with an inverted-file index.
+
+    Arms are clustered with k-means (numpy Lloyd iterations). A query only
+    scores the arms of the n_probe lists whose centroids have the largest
+    inner product with it. Larger n_probe → better recall, more work.
+    """
+
+    def __init__(self, n_lists=None, n_probe=8, n_iter=10, seed=0):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.n_iter = n_iter
+        self.seed = seed
+        self.size = 0
+
+    def build(self, arm_matrix):
+        arm_matrix = np.asarray(arm_matrix, dtype=float)
+        n = len(arm_matrix)
+        n_lists = self.n_lists or max(1, int(np.sqrt(n)))
+        n_lists = min(n_lists, n)
+
+        rng = np.random.default_rng(self.seed)
+        centroids = arm_matrix[rng.choice(n, n_lists, replace=False)].copy()
+        sq = (arm_matrix ** 2).sum(axis=1)
+
+        for _ in range(self.n_iter):
+            # ||x - c||² = ||x||² - 2 x·c + ||c||²
+            dist = sq[:, None] - 2 * arm_matrix @ centroids.T + (centroids ** 2).sum(axis=1)[None, :]
+            assign = np.argmin(dist, axis=1)
+            for c in range(n_lists):
+                members = arm_matrix[assign == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+
+        dist = sq[:, None] - 2 * arm_matrix @ centroids.T + (centroids ** 2).sum(axis=1)[None, :]
+        assign = np.argmin(dist, axis=1)
+
+        self.size = n
+        self.matrix = arm_matrix
+        self.centroids = centroids
+        self.lists = [np.flatnonzero(assign == c) for c in range(n_lists)]
+        return self
+
+    def _search_one(self, q, k):
+        n_probe = min(self.n_probe, len(self.lists))
+        probe = np.argpartition(-(self.centroids @ q), n_probe - 1)[:n_probe]
+        rows = np.concatenate([self.lists[c] for c in probe])
+        scores = self.matrix[rows] @ q
+        rows, scores = _sorted(rows, scores)
+        return rows[:k], scores[:k]
+
+    def search(self, q, k):
+        k = min(k, self.size)
+        q = np.asarray(q, dtype=float)
+        if k <= 0:
+            empty = (np.empty(0, dtype=int), np.empty(0))
+            return empty if q.ndim == 1 else [empty] * len(q)
+        if q.ndim == 1:
+            return self._search_one(q, k)
+        return [self._search_one(qi, k) for qi in q]
@@ -10,6 +10,8 @@ from bandit.bandit import ContextualBandit
 from bandit.modes.dataset_train_loop import dataset_train_loop
 from bandit.modes.agent_real_loop import agent_real_loop
 from bandit.modes.agent_test_loop import agent_test_loop
+from bandit.modes.simulation_loop import simulation_loop
+from bandit.core.preference_env import PreferenceEnvironment
 from bandit.core.dataset_loader import DatasetLoader
 # ---------------------------------------------------
 # main dispatcher
@@ -66,6 +68,24 @@ def main(mode="agent-test"):
         # agent-test 모드는 내부에서 랜덤 context를 생성함
         agent_test_loop(bandit)
 
+    elif mode == "simulation":
+        # gold preference score를 정답 reward로 쓰는 고속 시뮬레이션
+        score_root = "Scheduling/Gold_Information/Result_Score"
+        env = PreferenceEnvironment.from_score_dirs(
+            user_ids=range(1, 31),
+            dong_score_dir=f"{score_root}/Result_Location_Dong_Score",
+            gu_score_dir=f"{score_root}/Result_Location_Gu_Score",
+            schedule_score_dir=f"{score_root}/Result_Schedule_Score",
+            schedule_arm_path="Scheduling/Gold_Information/Schedule_Arm/schedule_arm_vectors.json",
+            d_g=16,
+        )
+        d_a = len(next(iter(env.arms.values())))
+        policies = {
+            "linear": ContextualBandit(global_pv, env.arms, LinearModel(d_g=16, d_a=d_a), epsilon=0.1),
+            "random": ContextualBandit(global_pv, env.arms, LinearModel(d_g=16, d_a=d_a), epsilon=1.0),
+        }
+        simulation_loop(policies, env, rounds=20000, batch_size=256)
+
     else:
         raise ValueError(f"Unknown mode: {mode}")
 
@@ -1,6 +1,21 @@
+import numpy as np
+
 class BaseModel:
     def score(self, G, A):
         raise NotImplementedError
 
+    def score_batch(self, G, arm_matrix):
+        """
+        Score every arm row of arm_matrix (n_arms, d_a).
+
+        G may be a single context (d_g,) → returns (n_arms,)
+        or a batch of contexts (B, d_g) → returns (B, n_arms).
+        Fallback loops over score(); subclasses override with a vectorized path.
+        """
+        G = np.asarray(G)
+        if G.ndim == 1:
+            return np.array([self.score(G, A) for A in arm_matrix], dtype=float)
+        return np.array([[self.score(g, A) for A in arm_matrix] for g in G], dtype=float)
+
     def update(self, samples):
         raise NotImplementedError
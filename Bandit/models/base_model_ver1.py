@@ -1,3 +1,4 @@
+from collections import deque
 from typing import Dict, List, Optional
 import numpy as np
 
@@ -6,22 +7,98 @@ STRONG_REWARD = 1.0  # Direct selection reward
 WEAK_REWARD = 0.1    # Indirect selection reward (gu → dong propagation)
 
 
+class RunningStats:
+    """O(1) running count / sum / exponential moving average of rewards."""
+
+    def __init__(self, ema_alpha: float = 0.01):
+        self.ema_alpha = ema_alpha
+        self.count = 0
+        self.reward_sum = 0.0
+        self.ema = None
+
+    def add(self, reward: float, n: int = 1) -> None:
+        """Record the same reward n times (n > 1 for batched weak rewards)."""
+        self.count += n
+        self.reward_sum += reward * n
+        if self.ema is None:
+            self.ema = float(reward)
+        else:
+            # n EMA steps with a constant reward, in closed form
+            decay = (1 - self.ema_alpha) ** n
+            self.ema = decay * self.ema + (1 - decay) * reward
+
+    def summary(self) -> Dict:
+        return {
+            'count': self.count,
+            'avg_reward': self.reward_sum / self.count if self.count else 0.0,
+            'ema_reward': self.ema if self.ema is not None else 0.0
+        }
+
+
+class DongArmIndex:
+    """
+    Precomputed gu → dong-arm index.
+
+    Dong arm keys are "{gu}_{dong}". Each gu maps to its dong keys and a stacked
+    (n_dongs, d_a) arm block, so weak-reward propagation is a dict lookup plus
+    a slice instead of a startswith() scan over every dong.
+    """
+
+    def __init__(self, dong_arms: Dict[str, np.ndarray]):
+        grouped: Dict[str, List[str]] = {}
+        for dong_key in dong_arms:
+            gu = dong_key.split("_", 1)[0]
+            grouped.setdefault(gu, []).append(dong_key)
+
+        self.blocks = {
+            gu: (keys, np.stack([np.asarray(dong_arms[k], dtype=float) for k in keys]))
+            for gu, keys in grouped.items()
+        }
+
+    def block(self, gu: str):
+        """Returns (dong_keys, arm_block) for a gu; ([], None) if the gu has no dongs."""
+        return self.blocks.get(gu, ([], None))
+
+
 class BaseModel:
-    
-    def __init__(self, d_g, d_a, lr = 0.01):
+    CONFIG_KEYS = ('d_g', 'd_a', 'lr')
+
+    def __init__(self, d_g, d_a, lr = 0.01, history_size: Optional[int] = 1000, ema_alpha: float = 0.01):
+        """
+        history_size: raw per-update history kept as a ring of this size
+                      (0 → no raw history, None → unbounded).
+        ema_alpha: smoothing of the moving-average rewards in get_training_stats().
+        """
         self.d_g = d_g
         self.d_a = d_a
         self.lr = lr
+        self.history_size = history_size
+        self.ema_alpha = ema_alpha
         
         # Initialize weight matrix with small random values
         self.M = np.random.randn(d_g, d_a) * 0.1
         
-        # Training history for analysis
-        self.training_history = []
+        # Training history for analysis (bounded) + O(1) running stats
+        self.reset_history()
+
+        # gu → dong block index, cached per dong_arms instance. An ArmRegistry
+        # is immutable; a plain dict can change in place: added / removed arms
+        # are caught by its size, replaced vectors need invalidate_dong_index().
+        self._dong_index = None
+        self._dong_index_src = None
+        self._dong_index_size = None
         
     def score(self, G, A) -> float:
         return float(G @ self.M @ A)
-    
+
+    def score_batch(self, G, arm_matrix) -> np.ndarray:
+        """Score all arm rows at once: (d_g,) → (n_arms,), (B, d_g) → (B, n_arms)."""
+        return (np.asarray(G) @ self.M) @ arm_matrix.T
+
+    def query_vector(self, G) -> np.ndarray:
+        """G @ M: score(G, A) == query_vector(G) @ A (MIPS query)."""
+        return np.asarray(G) @ self.M
+
     def update(self, samples: List[Dict]) -> None:
         if len(samples) == 0:
             return
@@ -45,19 +122,69 @@ class BaseModel:
     # Hierarchical Reward Methods
     # ========================================================================
     
+    def get_dong_index(self, dong_arms: Dict[str, np.ndarray]) -> DongArmIndex:
+        # the instance is held here, so `is` never matches a recycled object
+        if (self._dong_index is None or dong_arms is not self._dong_index_src
+                or len(dong_arms) != self._dong_index_size):
+            self._dong_index = DongArmIndex(dong_arms)
+            self._dong_index_src = dong_arms
+            self._dong_index_size = len(dong_arms)
+        return self._dong_index
+
+    def invalidate_dong_index(self) -> None:
+        """Drop the cached gu → dong index (after editing a dong_arms dict in place)."""
+        self._dong_index = None
+        self._dong_index_src = None
+
     def create_weak_rewards(self,G: np.ndarray,dong_arms: Dict[str, np.ndarray],selected_gu: str):
-        weak_samples = []
-        for dong_key, arm_vec in dong_arms.items():
-            if dong_key.startswith(selected_gu + "_"):
-                weak_samples.append({
-                    'G': G.copy() if isinstance(G, np.ndarray) else np.array(G),
-                    'A': arm_vec.copy() if isinstance(arm_vec, np.ndarray) else np.array(arm_vec),
-                    'reward': WEAK_REWARD,
-                    'arm_id': dong_key,
-                    'reward_type': 'weak'
-                })
-        
-        return weak_samples
+        keys, block = self.get_dong_index(dong_arms).block(selected_gu)
+        if not keys:
+            return []
+
+        G = np.array(G, dtype=float)   # one copy shared by every weak sample
+        return [
+            {
+                'G': G,
+                'A': block[i],
+                'reward': WEAK_REWARD,
+                'arm_id': dong_key,
+                'reward_type': 'weak'
+            }
+            for i, dong_key in enumerate(keys)
+        ]
+
+    def propagate_weak_rewards(
+        self,
+        G: np.ndarray,
+        dong_arms: Dict[str, np.ndarray],
+        selected_gu: str
+    ) -> int:
+        """
+        Vectorized weak-reward update over every dong of the selected gu.
+
+        All dongs share the same G, so the summed SGD step is rank-1:
+            M -= lr * G ⊗ (clip(G M A_blk^T - WEAK_REWARD) @ A_blk)
+        Predictions are taken at the current M for the whole block (one batch
+        step) rather than sample by sample.
+
+        Returns number of dongs updated.
+        """
+        keys, block = self.get_dong_index(dong_arms).block(selected_gu)
+        if not keys:
+            return 0
+
+        G = np.asarray(G, dtype=float)
+        preds = (G @ self.M) @ block.T
+        grads = np.clip(preds - WEAK_REWARD, -3, 3)
+        self.M -= self.lr * np.outer(G, grads @ block)
+
+        self._record(WEAK_REWARD, 'weak', 'unknown', n=len(keys))
+        if self.history_size != 0:
+            self.training_history.extend(
+                {'reward': WEAK_REWARD, 'arm_id': k, 'reward_type': 'weak', 'selection_type': 'unknown'}
+                for k in keys
+            )
+        return len(keys)
     
     def create_strong_reward(
         self,
@@ -92,44 +219,65 @@ class BaseModel:
     # Utility Methods
     # ========================================================================
     
+    def _record(self, reward, reward_type: str, selection_type: str, n: int = 1) -> None:
+        self.total_updates += n
+        if reward is None:
+            return
+        self.stats_all.add(reward, n)
+        self.stats_by_reward_type.setdefault(reward_type, RunningStats(self.ema_alpha)).add(reward, n)
+        self.stats_by_selection_type.setdefault(selection_type, RunningStats(self.ema_alpha)).add(reward, n)
+
     def log_training(self, sample: Dict) -> None:
-        """Log training sample for analysis."""
-        self.training_history.append({
-            'reward': sample.get('reward'),
-            'arm_id': sample.get('arm_id'),
-            'reward_type': sample.get('reward_type', 'unknown'),
-            'selection_type': sample.get('selection_type', 'unknown')
-        })
+        """Log training sample for analysis (O(1): running stats + bounded ring)."""
+        reward_type = sample.get('reward_type', 'unknown')
+        selection_type = sample.get('selection_type', 'unknown')
+        self._record(sample.get('reward'), reward_type, selection_type)
+
+        if self.history_size != 0:
+            self.training_history.append({
+                'reward': sample.get('reward'),
+                'arm_id': sample.get('arm_id'),
+                'reward_type': reward_type,
+                'selection_type': selection_type
+            })
     
     def get_training_stats(self) -> Dict:
-        if not self.training_history:
-            return {
-                'total_updates': 0,
-                'strong_rewards': 0,
-                'weak_rewards': 0,
-                'avg_reward': 0.0
-            }
-        
-        strong_count = sum(1 for h in self.training_history if h.get('reward_type') == 'strong')
-        weak_count = sum(1 for h in self.training_history if h.get('reward_type') == 'weak')
-        avg = np.mean([h['reward'] for h in self.training_history])
-        
+        """Read from running counters; cost does not grow with training length."""
+        by_reward = {k: v.summary() for k, v in self.stats_by_reward_type.items()}
+        by_selection = {k: v.summary() for k, v in self.stats_by_selection_type.items()}
+        overall = self.stats_all.summary()
+
         return {
-            'total_updates': len(self.training_history),
-            'strong_rewards': strong_count,
-            'weak_rewards': weak_count,
-            'avg_reward': float(avg)
+            'total_updates': self.total_updates,
+            'strong_rewards': by_reward.get('strong', {}).get('count', 0),
+            'weak_rewards': by_reward.get('weak', {}).get('count', 0),
+            'avg_reward': float(overall['avg_reward']),
+            'ema_reward': float(overall['ema_reward']),
+            'by_reward_type': by_reward,
+            'by_selection_type': by_selection
         }
     
     def reset_history(self) -> None:
-        """Clear training history."""
-        self.training_history = []
+        """Clear training history and running stats."""
+        self.training_history = deque(maxlen=self.history_size)
+        self.total_updates = 0
+        self.stats_all = RunningStats(self.ema_alpha)
+        self.stats_by_reward_type: Dict[str, RunningStats] = {}
+        self.stats_by_selection_type: Dict[str, RunningStats] = {}
     
     def reset_model(self) -> None:
         """Reset model to initial random weights."""
         self.M = np.random.randn(self.d_g, self.d_a) * 0.1
         self.reset_history()
     
+    def state_dict(self) -> Dict:
+        """Checkpointable state (see bandit.core.checkpoint)."""
+        return {'d_g': self.d_g, 'd_a': self.d_a, 'lr': self.lr, 'M': self.M}
+
+    def load_state_dict(self, state: Dict) -> None:
+        self.M = state['M']
+        self.lr = state['lr']
+
     def save_model(self, filepath: str) -> None:
         """Save model weights to file."""
         np.save(filepath, self.M)
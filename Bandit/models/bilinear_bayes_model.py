@@ -0,0 +1,159 @@
+import numpy as np
+from .base_model import BaseModel
+
+class BilinearBayesModel(BaseModel):
+    """
+    Bayesian ridge regression over x = vec(G ⊗ A), i.e. score = G @ M @ A with
+    M = theta.reshape(d_g, d_a).
+
+    The inverse covariance A_inv (d x d, d = d_g * d_a) is kept up to date with
+    Sherman–Morrison, so each sample costs O(d²) and nothing is re-inverted.
+
+    incremental = True: update() consumes each sample once, so the bandit must
+    pass only newly rewarded samples (not the whole history).
+    """
+    incremental = True
+    CONFIG_KEYS = ("d_g", "d_a", "lam")
+
+    def __init__(self, d_g, d_a, lam=1.0):
+        self.d_g = d_g
+        self.d_a = d_a
+        self.lam = lam
+
+        d = d_g * d_a
+        self.A_inv = np.eye(d) / lam
+        self.b = np.zeros(d)
+        self.theta = np.zeros(d)
+
+    @property
+    def M(self):
+        # same (d_g, d_a) layout as LinearModel.M
+        return self.theta.reshape(self.d_g, self.d_a)
+
+    def features(self, G, A):
+        return np.outer(G, A).ravel()
+
+    def mean_batch(self, G, arm_matrix):
+        return (np.asarray(G) @ self.M) @ arm_matrix.T
+
+    def variance_batch(self, G, arm_matrix):
+        """
+        x^T A_inv x for every (context, arm) pair, without building x.
+
+        With x = G ⊗ A, x^T A_inv x = A^T W(G) A where
+        W(G)[j, l] = sum_ik G_i A_inv[(i,j),(k,l)] G_k  (d_a x d_a),
+        so each context costs O(d²) and each arm O(d_a²).
+        """
+        G = np.asarray(G, dtype=float)
+        A4 = self.A_inv.reshape(self.d_g, self.d_a, self.d_g, self.d_a)
+        if G.ndim == 1:
+            W = np.einsum("i,ijkl,k->jl", G, A4, G)
+            quad = np.einsum("nj,jl,nl->n", arm_matrix, W, arm_matrix)
+        else:
+            W = np.einsum("bi,ijkl,bk->bjl", G, A4, G)
+            quad = np.einsum("nj,bjl,nl->bn", arm_matrix, W, arm_matrix)
+        return np.maximum(quad, 0.0)
+
+    def score_batch(self, G, arm_matrix):
+        # posterior mean (greedy); LinUCB / Thompson override with their exploration term.
+        # Defined here so score() never falls through to BaseModel's loop over score().
+        return self.mean_batch(G, arm_matrix)
+
+    def score(self, G, A):
+        return float(self.score_batch(G, np.asarray(A, dtype=float)[None, :])[0])
+
+    def update(self, samples):
+        for s in samples:
+            x = self.features(s["G"], s["A"])
+            r = s["reward"]
+
+            # Sherman–Morrison: (A + x x^T)^-1 = A_inv - (A_inv x)(A_inv x)^T / (1 + x^T A_inv x)
+            Ax = self.A_inv @ x
+            self.A_inv -= np.outer(Ax, Ax) / (1.0 + x @ Ax)
+            self.b += r * x
+        if samples:
+            self.theta = self.A_inv @ self.b
+
+    def state_dict(self):
+        state = {k: getattr(self, k) for k in self.CONFIG_KEYS}
+        state.update(A_inv=self.A_inv, b=self.b, theta=self.theta)
+        return state
+
+    def load_state_dict(self, state):
+        for k in self.CONFIG_KEYS:
+            setattr(self, k, state[k])
+        self.A_inv = state["A_inv"]
+        self.b = state["b"]
+        self.theta = state["theta"]
+
+
+class LinUCBModel(BilinearBayesModel):
+    """score = G @ M @ A + alpha * sqrt(x^T A_inv x)"""
+    CONFIG_KEYS = ("d_g", "d_a", "alpha", "lam")
+
+    def __init__(self, d_g, d_a, alpha=1.0, lam=1.0):
+        super().__init__(d_g, d_a, lam=lam)
+        self.alpha = alpha
+
+    def score_batch(self, G, arm_matrix):
+        mean = self.mean_batch(G, arm_matrix)
+        bonus = np.sqrt(self.variance_batch(G, arm_matrix))
+        return mean + self.alpha * bonus
+
+
+class ThompsonSamplingModel(BilinearBayesModel):
+    """
+    score = G @ M~ @ A with theta~ ~ N(theta, v² A_inv).
+
+    One theta~ is drawn per context, so all arms of a request are compared
+    under the same sample.
+
+    stochastic = True: the chosen arm is random given G, so its propensity is
+    not 1 (see pick_probabilities / ContextualBandit.propensity_draws).
+    """
+    CONFIG_KEYS = ("d_g", "d_a", "v", "lam")
+    stochastic = True
+
+    def __init__(self, d_g, d_a, v=1.0, lam=1.0, seed=None):
+        super().__init__(d_g, d_a, lam=lam)
+        self.v = v
+        self.rng = np.random.default_rng(seed)
+        self._chol = None   # cached Cholesky factor of A_inv, reset on update
+
+    def _cholesky(self):
+        if self._chol is None:
+            S = (self.A_inv + self.A_inv.T) / 2   # remove round-off asymmetry
+            try:
+                self._chol = np.linalg.cholesky(S)
+            except np.linalg.LinAlgError:
+                self._chol = np.linalg.cholesky(S + 1e-9 * np.eye(len(S)))
+        return self._chol
+
+    def sample_theta(self, n=None):
+        L = self._cholesky()
+        size = (len(self.theta),) if n is None else (n, len(self.theta))
+        z = self.rng.standard_normal(size)
+        return self.theta + self.v * (z @ L.T)
+
+    def score_batch(self, G, arm_matrix):
+        G = np.asarray(G, dtype=float)
+        if G.ndim == 1:
+            M = self.sample_theta().reshape(self.d_g, self.d_a)
+            return (G @ M) @ arm_matrix.T
+        Ms = self.sample_theta(len(G)).reshape(len(G), self.d_g, self.d_a)
+        return np.einsum("bi,bij->bj", G, Ms) @ arm_matrix.T
+
+    def pick_probabilities(self, G, arm_matrix, n_draws):
+        """Monte-Carlo P(arm is the argmax under theta~) for one context G → (n_arms,)."""
+        Ms = self.sample_theta(n_draws).reshape(n_draws, self.d_g, self.d_a)
+        scores = np.einsum("i,bij->bj", np.asarray(G, dtype=float), Ms) @ np.asarray(arm_matrix).T
+        return np.bincount(scores.argmax(axis=1), minlength=len(arm_matrix)) / n_draws
+
+    def update(self, samples):
+        super().update(samples)
+        if samples:
+            self._chol = None
+
+    def load_state_dict(self, state):
+        super().load_state_dict(state)
+        self._chol = None
@@ -2,6 +2,8 @@ import numpy as np
 from .base_model import BaseModel
 
 class LinearModel(BaseModel):
+    CONFIG_KEYS = ("d_g", "d_a", "lr")
+
     def __init__(self, d_g, d_a, lr=0.01):
         self.M = np.random.randn(d_g, d_a) * 0.1
         self.lr = lr
@@ -9,6 +11,14 @@ class LinearModel(BaseModel):
     def score(self, G, A):
         return float(G @ self.M @ A)
 
+    def score_batch(self, G, arm_matrix):
+        # (G @ M) first: one (d_g, d_a) product per context, then a single matmul over all arms
+        return (np.asarray(G) @ self.M) @ arm_matrix.T
+
+    def query_vector(self, G):
+        # score = query_vector(G) · A → usable with a MIPS index over arm rows
+        return np.asarray(G) @ self.M
+
     def update(self, samples):
         for s in samples:
             G = s["G"]
@@ -20,3 +30,47 @@ class LinearModel(BaseModel):
             grad = np.clip(grad, -3, 3)
             # d/dM = grad * (G outer A)
             self.M -= self.lr * grad * np.outer(G, A)
+
+    def fit_closed_form(self, dataset, lam=1.0, chunk_size=4096):
+        """
+        Exact ridge fit of M on a whole offline dataset.
+
+        score = G @ M @ A = vec(M) · vec(G ⊗ A), so
+            vec(M) = (X^T X + lam I)^-1 X^T r,   X rows = vec(G ⊗ A)
+        The normal equations are accumulated chunk by chunk (dataset may be any
+        iterable / generator), then solved once.
+
+        dataset entries: {"G", "A", "reward"} (buffer samples)
+                      or {"global_context", "arm_context", "reward"} (DatasetLoader)
+        """
+        d_g, d_a = self.M.shape
+        d = d_g * d_a
+        XtX = np.zeros((d, d))
+        Xty = np.zeros(d)
+
+        def flush(Gs, As, rs):
+            X = np.einsum("bi,bj->bij", np.asarray(Gs, dtype=float), np.asarray(As, dtype=float)).reshape(len(rs), d)
+            XtX[...] += X.T @ X
+            Xty[...] += X.T @ np.asarray(rs, dtype=float)
+
+        Gs, As, rs = [], [], []
+        for s in dataset:
+            Gs.append(s["G"] if "G" in s else s["global_context"])
+            As.append(s["A"] if "A" in s else s["arm_context"])
+            rs.append(s["reward"])
+            if len(rs) >= chunk_size:
+                flush(Gs, As, rs)
+                Gs, As, rs = [], [], []
+        if rs:
+            flush(Gs, As, rs)
+
+        XtX[np.diag_indices(d)] += lam
+        self.M = np.linalg.solve(XtX, Xty).reshape(d_g, d_a)
+
+    def state_dict(self):
+        d_g, d_a = self.M.shape
+        return {"d_g": d_g, "d_a": d_a, "lr": self.lr, "M": self.M}
+
+    def load_state_dict(self, state):
+        self.M = state["M"]
+        self.lr = state["lr"]
@@ -1,13 +1,28 @@
+import copy
+
 import torch
 import torch.nn as nn
 import numpy as np
 from .base_model import BaseModel
 
 class NeuralModel(BaseModel):
-    def __init__(self, d_g, d_a, hidden=64, lr=1e-3):
+    CONFIG_KEYS = ("d_g", "d_a", "hidden", "lr", "batch_size")
+
+    def __init__(self, d_g, d_a, hidden=64, lr=1e-3, batch_size=None, num_threads=None):
+        """
+        batch_size: samples per optimizer step in update() (None → one step over all samples)
+        num_threads: torch CPU threads for scoring/training (None → torch default).
+                     NOTE: torch.set_num_threads is process-wide.
+        """
         super().__init__()
         self.d_g = d_g
         self.d_a = d_a
+        self.hidden = hidden
+        self.lr = lr
+        self.batch_size = batch_size
+
+        if num_threads is not None:
+            torch.set_num_threads(num_threads)
 
         self.net = nn.Sequential(
             nn.Linear(d_g + d_a, hidden),
@@ -16,26 +31,127 @@ class NeuralModel(BaseModel):
         )
         self.optim = torch.optim.Adam(self.net.parameters(), lr=lr)
 
+        # arm matrix → tensor conversion, and the arms' share of the first
+        # layer (A @ W_a.T), are cached across score_batch calls; the latter
+        # is recomputed after every weight change (_weights_version)
+        self._arm_source = None
+        self._arm_tensor = None
+        self._arm_hidden = None
+        self._arm_hidden_version = None
+        self._weights_version = 0
+
+    def __deepcopy__(self, memo):
+        """Parameters and optimizer state are copied; the arm tensor cache is rebuilt lazily."""
+        other = object.__new__(type(self))
+        memo[id(self)] = other
+        for key, value in self.__dict__.items():
+            if key in ("_arm_source", "_arm_tensor", "_arm_hidden", "_arm_hidden_version"):
+                value = None
+            setattr(other, key, copy.deepcopy(value, memo))
+        return other
+
     def score(self, G, A):
         x = torch.from_numpy(np.concatenate([G, A])).float()
-        return float(self.net(x).item())
+        with torch.inference_mode():
+            return float(self.net(x).item())
+
+    def _arm_tensor_for(self, arm_matrix):
+        if arm_matrix is not self._arm_source:
+            self._arm_source = arm_matrix
+            arms = np.asarray(arm_matrix, dtype=np.float32)
+            if not arms.flags.writeable:      # ArmRegistry matrices are read-only
+                arms = arms.copy()
+            self._arm_tensor = torch.from_numpy(arms)
+            self._arm_hidden = None
+        return self._arm_tensor
+
+    def _arm_hidden_for(self, arm_matrix):
+        """A @ W_a.T (n_arms, hidden): the arm half of the first layer, once per arm set and weights."""
+        arms = self._arm_tensor_for(arm_matrix)
+        if self._arm_hidden is None or self._arm_hidden_version != self._weights_version:
+            W_a = self.net[0].weight[:, self.d_g:]
+            self._arm_hidden = arms @ W_a.T
+            self._arm_hidden_version = self._weights_version
+        return self._arm_hidden
+
+    def score_batch(self, G, arm_matrix):
+        """
+        All arms for one context (d_g,) → (n_arms,), or for a batch (B, d_g) → (B, n_arms),
+        in a single forward pass.
+
+        The first layer is split as [G, A] @ W.T = G @ W_g.T + A @ W_a.T: the
+        context half is computed once per context, the arm half once per arm
+        (cached), and the two are broadcast-added, so no (B, n_arms, d_g + d_a)
+        input is built.
+        """
+        G = np.asarray(G)
+        first = self.net[0]
+
+        with torch.inference_mode():
+            arm_hidden = self._arm_hidden_for(arm_matrix)                  # (n, hidden)
+            g = torch.as_tensor(np.atleast_2d(G), dtype=torch.float32)
+            g_hidden = g @ first.weight[:, :self.d_g].T + first.bias        # (B, hidden)
+            h = g_hidden[:, None, :] + arm_hidden[None, :, :]              # (B, n, hidden)
+            out = self.net[1:](h).squeeze(-1).numpy().astype(float)
+
+        return out[0] if G.ndim == 1 else out
 
     def update(self, samples):
-        if len(samples) == 0: 
+        if len(samples) == 0:
             return
 
-        self.optim.zero_grad()
-        loss_sum = 0
+        X = torch.as_tensor(
+            np.stack([np.concatenate([s["G"], s["A"]]) for s in samples]),
+            dtype=torch.float32
+        )
+        y = torch.as_tensor([s["reward"] for s in samples], dtype=torch.float32)
+
+        step = self.batch_size or len(samples)
+        for start in range(0, len(samples), step):
+            xb = X[start:start + step]
+            yb = y[start:start + step]
+
+            self.optim.zero_grad()
+            pred = self.net(xb).squeeze(-1)
+            loss = ((pred - yb) ** 2).sum()
+            loss.backward()
+            self.optim.step()
+        self._weights_version += 1
+
+    def state_dict(self):
+        """
+        Flat numpy/JSON view of the network and the Adam state:
+            net.<param>               network tensors
+            optim.<i>.<key>           per-parameter optimizer tensors (exp_avg, step, ...)
+            optim_param_groups        optimizer hyper-parameters (JSON)
+        """
+        state = {k: getattr(self, k) for k in self.CONFIG_KEYS}
+        for name, t in self.net.state_dict().items():
+            state[f"net.{name}"] = t.detach().cpu().numpy()
 
-        for s in samples:
-            G = s["G"]
-            A = s["A"]
-            r = s["reward"]
+        optim_state = self.optim.state_dict()
+        for i, per_param in optim_state["state"].items():
+            for key, value in per_param.items():
+                state[f"optim.{i}.{key}"] = (value.detach().cpu().numpy()
+                                             if torch.is_tensor(value) else np.asarray(value))
+        state["optim_param_groups"] = optim_state["param_groups"]
+        return state
 
-            x = torch.from_numpy(np.concatenate([G, A])).float()
-            pred = self.net(x)
-            loss = (pred - torch.tensor([r], dtype=torch.float))**2
-            loss_sum += loss
+    def load_state_dict(self, state):
+        self.batch_size = state.get("batch_size", self.batch_size)
+        self.net.load_state_dict({
+            k[len("net."):]: torch.tensor(np.asarray(v))
+            for k, v in state.items() if k.startswith("net.")
+        })
 
-        loss_sum.backward()
-        self.optim.step()
+        per_param = {}
+        for k, v in state.items():
+            if k.startswith("optim.") and k.count(".") == 2:
+                _, i, key = k.split(".")
+                per_param.setdefault(int(i), {})[key] = torch.tensor(np.asarray(v))
+        self.optim.load_state_dict({
+            "state": per_param,
+            "param_groups": state["optim_param_groups"]
+        })
+        self._arm_source = None
+        self._weights_version += 1
@@ -0,0 +1,62 @@
+import copy
+
+import numpy as np
+from .base_model import BaseModel
+
+class ResidualLinearModel(BaseModel):
+    """
+    Per-tenant bilinear model layered over a shared base:
+
+        score = G @ (base.M + R) @ A
+
+    Only the residual R (float32, d_g x d_a) belongs to the tenant; base is a
+    shared LinearModel-like object exposing M and is never written here.
+    """
+    CONFIG_KEYS = ("d_g", "d_a", "lr")
+
+    def __init__(self, d_g, d_a, lr=0.01, base=None):
+        self.d_g = d_g
+        self.d_a = d_a
+        self.lr = lr
+        self.base = base
+        self.R = np.zeros((d_g, d_a), dtype=np.float32)
+
+    def __deepcopy__(self, memo):
+        """Copies the residual only; the copy keeps sharing the same base."""
+        other = copy.copy(self)
+        other.R = self.R.copy()
+        memo[id(self)] = other
+        return other
+
+    @property
+    def M(self):
+        return self.base.M + self.R
+
+    def score(self, G, A):
+        return float(G @ self.M @ A)
+
+    def score_batch(self, G, arm_matrix):
+        return self.query_vector(G) @ arm_matrix.T
+
+    def query_vector(self, G):
+        G = np.asarray(G)
+        return G @ self.base.M + G @ self.R
+
+    def update(self, samples):
+        for s in samples:
+            G = s["G"]
+            A = s["A"]
+            r = s["reward"]
+
+            pred = self.score(G, A)
+            grad = (pred - r)
+            grad = np.clip(grad, -3, 3)
+            # only the residual moves; the shared base stays fixed
+            self.R -= (self.lr * grad * np.outer(G, A)).astype(np.float32)
+
+    def state_dict(self):
+        return {"d_g": self.d_g, "d_a": self.d_a, "lr": self.lr, "R": self.R}
+
+    def load_state_dict(self, state):
+        self.R = state["R"]
+        self.lr = state["lr"]
@@ -1,4 +1,10 @@
-def dataset_train_loop(bandit, dataset):
+def dataset_train_loop(bandit, dataset, closed_form=False, lam=1.0):
+    # closed_form: LinearModel cold start with one ridge solve instead of per-sample SGD
+    if closed_form and hasattr(bandit.model, "fit_closed_form"):
+        bandit.model.fit_closed_form(dataset, lam=lam)
+        print(f"[train] closed-form fit done (lam={lam})")
+        return
+
     for step, sample in enumerate(dataset):
         G = sample["global_context"]
         arm = sample["arm"]
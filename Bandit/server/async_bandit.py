@@ -0,0 +1,187 @@
+# bandit/server/async_bandit.py
+
+import asyncio
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from bandit.server.pending_actions import PendingActionTable
+
+
+class AsyncBanditService:
+    """
+    asyncio front end for a ContextualBandit.
+
+        result = await service.infer(context)               # {"request_id", "arm", "idx"}
+        ack    = await service.reward(result["request_id"], 1.0)
+
+    Each infer() gets its own future keyed by request id. Concurrent calls are
+    micro-batched (max_batch / max_wait_ms) and scored together with
+    infer_batch_with_context in a single-worker executor, so the event loop
+    never blocks on the model and model access stays serialized. No queues, no
+    polling threads. A malformed context is rejected by its own infer() call;
+    if a batch still fails, its contexts are retried one by one so only the
+    failing request sees the error.
+    """
+
+    def __init__(self, bandit, executor=None, max_batch=32, max_wait_ms=2.0,
+                 pending_ttl=600.0, pending_max_size=10000):
+        self.bandit = bandit
+        self.executor = executor or ThreadPoolExecutor(max_workers=1)
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        self.pending = PendingActionTable(ttl=pending_ttl, max_size=pending_max_size)
+
+        self._queue = []          # [(request_id, context)] waiting for the next batch
+        self._futures = {}        # request_id → asyncio.Future
+        self._wakeup = None
+        self._batcher = None
+
+    async def start(self):
+        self._wakeup = asyncio.Event()
+        self._batcher = asyncio.get_running_loop().create_task(self._batch_loop())
+        self._batcher.add_done_callback(self._batcher_done)
+        return self
+
+    def _batcher_done(self, task):
+        """The batch loop should never end on its own; if it does, fail every waiting infer()."""
+        if task.cancelled():
+            return
+        error = RuntimeError("bandit batch loop stopped")
+        error.__cause__ = task.exception()
+        for fut in self._futures.values():
+            if not fut.done():
+                fut.set_exception(error)
+        self._futures.clear()
+
+    async def close(self):
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+            self._batcher = None
+        for fut in self._futures.values():
+            if not fut.done():
+                fut.cancel()
+        self._futures.clear()
+        self.executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    # ------------------------------------------------------------------
+    # public API
+    # ------------------------------------------------------------------
+    async def infer(self, context, request_id=None):
+        if self._batcher is None:
+            await self.start()
+        elif self._batcher.done():
+            raise RuntimeError("bandit batch loop stopped") from self._batcher.exception()
+
+        request_id = request_id or uuid.uuid4().hex
+        if request_id in self._futures:
+            raise ValueError(f"duplicate in-flight request_id={request_id}")
+        context = self._check_context(context)     # a bad context fails here, not in the batch
+
+        fut = asyncio.get_running_loop().create_future()
+        self._futures[request_id] = fut
+        self._queue.append((request_id, context))
+        self._wakeup.set()
+        return await fut
+
+    async def reward(self, request_id, reward):
+        """
+        Returns ack: {"request_id", "status"}
+            applied           → model updated
+            expired / evicted → action too old; counted, not applied
+            matched           → duplicate reward; counted, not applied
+            early             → action not seen yet; applied when it is registered
+        """
+        idx = self.pending.match(request_id, reward)
+        if idx is not None:
+            await self._run(self.bandit.give_rewards, [(idx, reward)])
+            return {"request_id": request_id, "status": "applied"}
+
+        return {"request_id": request_id, "status": self.pending.state(request_id)}
+
+    # ------------------------------------------------------------------
+    # batching
+    # ------------------------------------------------------------------
+    def _check_context(self, context):
+        try:
+            context = np.asarray(context, dtype=float)
+        except (TypeError, ValueError):
+            raise ValueError("context must be a list of numbers") from None
+        model = self.bandit.model
+        d_g = getattr(model, "d_g", None)
+        if d_g is None and hasattr(model, "M"):
+            d_g = model.M.shape[0]
+        if context.ndim != 1 or (d_g is not None and len(context) != d_g):
+            raise ValueError(f"expected a context of shape ({d_g},), got {context.shape}")
+        return context
+
+    async def _infer_batch(self, batch):
+        """
+        [(request_id, result or exception)]. One vectorized call; if it fails,
+        each context is retried on its own so only the bad requests fail.
+        """
+        try:
+            results = await self._run(self.bandit.infer_batch_with_context,
+                                      [ctx for _, ctx in batch])
+            return [(rid, result) for (rid, _), result in zip(batch, results)]
+        except Exception as e:
+            if len(batch) == 1:
+                return [(batch[0][0], e)]
+
+        outcomes = []
+        for rid, ctx in batch:
+            try:
+                outcomes.append((rid, await self._run(self.bandit.infer_with_context, ctx)))
+            except Exception as e:
+                outcomes.append((rid, e))
+        return outcomes
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    async def _batch_loop(self):
+        while True:
+            await self._wakeup.wait()
+            if len(self._queue) < self.max_batch and self.max_wait_ms > 0:
+                await asyncio.sleep(self.max_wait_ms / 1000.0)   # let concurrent requests join
+
+            batch = self._queue[:self.max_batch]
+            self._queue = self._queue[self.max_batch:]
+            if not self._queue:
+                self._wakeup.clear()
+            if not batch:
+                continue
+
+            early = []
+            for rid, outcome in await self._infer_batch(batch):
+                fut = self._futures.pop(rid, None)
+                if isinstance(outcome, Exception):
+                    if fut is not None and not fut.done():
+                        fut.set_exception(outcome)
+                    continue
+
+                arm, idx = outcome
+                early_reward = self.pending.add(rid, idx)
+                if early_reward is not None:
+                    early.append((idx, early_reward))
+                if fut is not None and not fut.done():
+                    fut.set_result({"request_id": rid, "arm": arm, "idx": idx})
+
+            try:
+                self.pending.expire()
+                if early:
+                    await self._run(self.bandit.give_rewards, early)
+            except Exception as e:
+                # the infer results are already delivered; only these rewards are lost
+                print(f"[bandit] ERROR: early rewards not applied ({len(early)}): {e!r}")
@@ -1,11 +1,48 @@
 # bandit/server/bandit_server.py
 
+import numbers
 import queue
 import time
 import threading
+import uuid
+
+from bandit.core import instrumentation as instr
+from bandit.server.pending_actions import PendingActionTable
+
+
+def check_message(msg):
+    """Why msg cannot be handled by BanditServer, or None if it is well formed."""
+    if not isinstance(msg, dict):
+        return "message is not an object"
+    request_id = msg.get("request_id")
+    if request_id is not None and (not isinstance(request_id, (str, int)) or isinstance(request_id, bool)):
+        return "request_id must be a string or an integer"
+    idx = msg.get("idx")
+    if idx is not None and (not isinstance(idx, numbers.Integral) or isinstance(idx, bool)):
+        return "idx must be an integer"
+    kind = msg.get("type")
+    if kind == "context":
+        if "context" not in msg:
+            return "context message without 'context'"
+    elif kind == "reward":
+        if not isinstance(msg.get("reward"), numbers.Real) or isinstance(msg["reward"], bool):
+            return "reward message without a numeric 'reward'"
+    else:
+        return f"unknown message type {kind!r}"
+    return None
+
 
 class BanditServer:
-    def __init__(self, bandit_model, inbound_queue, outbound_queue):
+    def __init__(self, bandit_model, inbound_queue, outbound_queue,
+                 pending_ttl=600.0, pending_max_size=10000, expire_interval=1.0,
+                 max_batch=32, max_wait_ms=5.0):
+        """
+        pending_ttl: seconds an inferred action waits for its reward
+        pending_max_size: bound on pending actions (oldest evicted first)
+        expire_interval: how often stale pending entries are expired (batch)
+        max_batch / max_wait_ms: micro-batching window of run() — up to
+            max_batch messages, or whatever arrived max_wait_ms after the first
+        """
         self.model = bandit_model
         self.in_q = inbound_queue
         self.out_q = outbound_queue
@@ -14,6 +51,16 @@ class BanditServer:
         self.last_arm = None
         self.last_context = None
 
+        # request_id → buffer idx, for delayed rewards
+        self.pending = PendingActionTable(ttl=pending_ttl, max_size=pending_max_size)
+        self.expire_interval = expire_interval
+        self._last_expire = time.monotonic()
+
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+
+        self.metrics = {"applied_rewards": 0, "rejected_rewards": 0, "rejected_messages": 0}
+
         self._running = False  # ← 종료 플래그
 
     def start(self):
@@ -30,42 +77,172 @@ class BanditServer:
         print("[bandit] server started.")
 
         while self._running:
-            try:
-                msg = self.in_q.get(timeout=0.05)   # ← time.sleep 대신 queue timeout
-                self.handle_message(msg)
-            except queue.Empty:
-                pass
+            batch = self.collect_batch()
+            if batch:
+                instr.gauge("server.in_q_depth", self.in_q.qsize())
+                instr.gauge("server.out_q_depth", self.out_q.qsize())
+                instr.gauge("server.pending_actions", len(self.pending))
+                with instr.span("server.handle_batch"):
+                    self.handle_batch(batch)
+            self.maybe_expire()
 
         print("[bandit] server stopped.")
 
-    def handle_message(self, msg):
-        msg_type = msg["type"]
-
-        if msg_type == "context":
-            G = msg["context"]
-            arm, idx = self.model.infer_with_context(G)
-
-            self.last_arm = arm
-            self.last_idx = idx
-            self.last_context = G
-
-            self.out_q.put({
-                "type": "infer_result",
-                "arm": arm,
-                "idx": idx
-            })
-            print(f"[bandit] inferred arm={arm}, idx={idx}")
-
-        elif msg_type == "reward":
-            reward = msg["reward"]
-            idx = msg.get("idx", self.last_idx)
+    def collect_batch(self):
+        """Drain up to max_batch messages, waiting at most max_wait_ms after the first."""
+        try:
+            first = self.in_q.get(timeout=0.05)   # ← time.sleep 대신 queue timeout
+        except queue.Empty:
+            return []
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait_ms / 1000.0
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self.in_q.get(timeout=remaining))
+                else:
+                    batch.append(self.in_q.get_nowait())   # take what is already queued
+            except queue.Empty:
+                break
+        return batch
+
+    def maybe_expire(self):
+        now = time.monotonic()
+        if now - self._last_expire >= self.expire_interval:
+            self._last_expire = now
+            n = self.pending.expire()
+            if n:
+                print(f"[bandit] expired {n} pending actions")
+
+    def apply_rewards(self, rewards):
+        """
+        rewards: list of (idx, reward) → one model update. If that update
+        fails, the rewards are applied one at a time and only the failing
+        ones are dropped, so the server thread keeps running.
+        """
+        applied = len(rewards)
+        try:
+            self.model.give_rewards(rewards)
+        except Exception as e:
+            print(f"[bandit] ERROR: batched update failed ({e!r}); applying rewards one by one")
+            applied = 0
+            for idx, reward in rewards:
+                try:
+                    self.model.give_rewards([(idx, reward)])
+                    applied += 1
+                except Exception as e:
+                    self.metrics["rejected_rewards"] += 1
+                    print(f"[bandit] ERROR: reward for idx={idx} not applied: {e!r}")
+        self.metrics["applied_rewards"] += applied
+        print(f"[bandit] updated: {applied} rewards")
+
+    def reject(self, msg, detail):
+        """Drop one message; contexts get an error reply so their sender is not left waiting."""
+        self.metrics["rejected_messages"] += 1
+        request_id = msg.get("request_id") if isinstance(msg, dict) else None
+        print(f"[bandit] ERROR: rejected message (request_id={request_id!r}): {detail}")
+        if isinstance(request_id, (str, int)):
+            self.out_q.put({"type": "error", "request_id": request_id, "detail": detail})
+
+    def infer_contexts(self, contexts):
+        """
+        [(msg, (arm, idx))] for the context messages. One vectorized call; if
+        it fails, the contexts are scored one at a time and the ones that
+        still fail (wrong dimension, non-numeric values) are rejected.
+        """
+        try:
+            with instr.span("server.infer_batch"):
+                results = self.model.infer_batch_with_context([m["context"] for m in contexts])
+            return list(zip(contexts, results))
+        except (ValueError, TypeError):
+            pass
+
+        scored = []
+        for msg in contexts:
+            try:
+                scored.append((msg, self.model.infer_with_context(msg["context"])))
+            except (ValueError, TypeError) as e:
+                self.reject(msg, f"bad context: {e}")
+        return scored
 
+    def handle_message(self, msg):
+        self.handle_batch([msg])
+
+    def handle_batch(self, msgs):
+        """
+        Contexts in the window are scored in one vectorized call; rewards
+        (including ones for contexts in the same window) go into one update.
+        """
+        if instr.is_enabled():
+            now = time.monotonic()
+            instr.count("server.messages", len(msgs))
+            for m in msgs:
+                if isinstance(m, dict) and "enqueued_at" in m:      # set by producers that want queue wait measured
+                    instr.observe("server.queue_wait", now - m["enqueued_at"])
+
+        contexts, rewards = [], []
+        for m in msgs:
+            problem = check_message(m)
+            if problem is not None:
+                self.reject(m, problem)       # one bad message never takes the batch down
+            elif m["type"] == "context":
+                contexts.append(m)
+            else:
+                rewards.append(m)
+
+        to_apply = []
+
+        if contexts:
+            for msg, (arm, idx) in self.infer_contexts(contexts):
+                request_id = msg.get("request_id") or uuid.uuid4().hex
+
+                self.last_arm = arm
+                self.last_idx = idx
+                self.last_context = msg["context"]
+
+                early_reward = self.pending.add(request_id, idx)
+
+                self.out_q.put({
+                    "type": "infer_result",
+                    "request_id": request_id,
+                    "arm": arm,
+                    "idx": idx
+                })
+                print(f"[bandit] inferred arm={arm}, idx={idx}, request_id={request_id}")
+
+                if early_reward is not None:
+                    # reward overtook its context message
+                    to_apply.append((idx, early_reward))
+
+        for msg in rewards:
+            idx = self.resolve_reward(msg)
+            if idx is not None:
+                to_apply.append((idx, msg["reward"]))
+
+        if to_apply:
+            self.apply_rewards(to_apply)
+
+    def resolve_reward(self, msg):
+        """Buffer idx the reward belongs to, or None if it must not be applied (now)."""
+        reward = msg["reward"]
+        request_id = msg.get("request_id")
+
+        if request_id is None:
+            # explicit buffer idx is still accepted; there is no "last idx" guess
+            idx = msg.get("idx")
             if idx is None:
-                print("[bandit] ERROR: reward arrived but no last idx")
-                return
-
-            self.model.give_reward(idx, reward)
-            print(f"[bandit] updated: idx={idx}, reward={reward}")
-
-        else:
-            print(f"[bandit] Unknown message type: {msg_type}")
+                self.metrics["rejected_rewards"] += 1
+                print("[bandit] ERROR: reward arrived without request_id or idx")
+            elif idx not in self.model.buffer:
+                self.metrics["rejected_rewards"] += 1
+                print(f"[bandit] ERROR: reward for unknown idx={idx}")
+                return None
+            return idx
+
+        idx = self.pending.match(request_id, reward)
+        if idx is None:
+            print(f"[bandit] reward for request_id={request_id} not applied "
+                  f"({self.pending.state(request_id)})")
+        return idx
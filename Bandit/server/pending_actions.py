@@ -0,0 +1,136 @@
+# bandit/server/pending_actions.py
+
+import time
+from collections import OrderedDict
+
+
+class PendingActionTable:
+    """
+    Joins delayed rewards to the action they belong to, by request id.
+
+    - pending:  request_id → (entry_idx, created_at); insertion order == age,
+                so expiry pops from the front in one batch
+    - closed:   recently expired / evicted / rewarded ids, so a late or
+                duplicate reward is counted instead of being credited to anything
+    - early:    rewards that arrived before their action was registered
+                (out of order); applied as soon as the action shows up
+
+    All three are bounded (ttl + max_size).
+    """
+
+    def __init__(self, ttl=600.0, max_size=10000, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.clock = clock
+
+        self._pending = OrderedDict()
+        self._closed = OrderedDict()      # request_id → (reason, closed_at)
+        self._early = OrderedDict()
+
+        self.metrics = {
+            "registered": 0,
+            "matched": 0,
+            "expired_actions": 0,
+            "evicted_actions": 0,
+            "expired_rewards": 0,
+            "duplicate_rewards": 0,
+            "early_rewards": 0,
+            "early_matched": 0,
+            "dropped_early_rewards": 0,
+        }
+
+    def __len__(self):
+        return len(self._pending)
+
+    def _close(self, request_id, reason, now):
+        self._closed[request_id] = (reason, now)
+        while len(self._closed) > self.max_size:
+            self._closed.popitem(last=False)
+
+    def state(self, request_id):
+        """One of: pending, early, matched, expired, evicted, unknown."""
+        if request_id in self._pending:
+            return "pending"
+        if request_id in self._early:
+            return "early"
+        if request_id in self._closed:
+            return self._closed[request_id][0]
+        return "unknown"
+
+    def add(self, request_id, entry_idx):
+        """
+        Register an action. If its reward already arrived (out of order) the
+        reward is returned and the action is not kept pending.
+        """
+        now = self.clock()
+        self.metrics["registered"] += 1
+
+        early = self._early.pop(request_id, None)
+        if early is not None:
+            self.metrics["early_matched"] += 1
+            self._close(request_id, "matched", now)
+            return early[0]
+
+        self._pending[request_id] = (entry_idx, now)
+        while len(self._pending) > self.max_size:
+            old_id, _ = self._pending.popitem(last=False)
+            self._close(old_id, "evicted", now)
+            self.metrics["evicted_actions"] += 1
+        return None
+
+    def match(self, request_id, reward):
+        """
+        Resolve a reward.
+
+        Returns:
+            entry_idx → apply the reward to this buffer entry
+            None      → nothing to apply now (expired, or held as an early reward)
+        """
+        hit = self._pending.pop(request_id, None)
+        if hit is not None:
+            self.metrics["matched"] += 1
+            self._close(request_id, "matched", self.clock())
+            return hit[0]
+
+        closed = self._closed.get(request_id)
+        if closed is not None:
+            key = "duplicate_rewards" if closed[0] == "matched" else "expired_rewards"
+            self.metrics[key] += 1
+            return None
+
+        # action not registered yet → keep the reward until it is (or until ttl)
+        self._early[request_id] = (reward, self.clock())
+        self.metrics["early_rewards"] += 1
+        while len(self._early) > self.max_size:
+            self._early.popitem(last=False)
+            self.metrics["dropped_early_rewards"] += 1
+        return None
+
+    def expire(self, now=None):
+        """Drop everything older than ttl in one pass. Returns number of expired actions."""
+        now = self.clock() if now is None else now
+        cutoff = now - self.ttl
+
+        n = 0
+        while self._pending:
+            request_id, (_, created_at) = next(iter(self._pending.items()))
+            if created_at > cutoff:
+                break
+            self._pending.popitem(last=False)
+            self._close(request_id, "expired", now)
+            n += 1
+        self.metrics["expired_actions"] += n
+
+        while self._early:
+            _, (_, arrived_at) = next(iter(self._early.items()))
+            if arrived_at > cutoff:
+                break
+            self._early.popitem(last=False)
+            self.metrics["dropped_early_rewards"] += 1
+
+        while self._closed:
+            _, (_, closed_at) = next(iter(self._closed.items()))
+            if closed_at > cutoff:
+                break
+            self._closed.popitem(last=False)
+        return n
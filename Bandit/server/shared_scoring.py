@@ -0,0 +1,276 @@
+# bandit/server/shared_scoring.py
+
+import itertools
+import multiprocessing as mp
+import threading
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from bandit.models.bilinear_bayes_model import BilinearBayesModel
+
+_HEADER = 5   # int64: seq (M), arms_seq, d_g, d_a, n_arms
+
+
+class SharedBilinearWeights:
+    """
+    M (d_g, d_a) and the arm matrix (n_arms, d_a) in one shared-memory block,
+    each guarded by its own seqlock counter.
+
+        [seq | arms_seq | d_g | d_a | n_arms | M ... | arm_matrix ...]
+
+    Single writer: a counter becomes odd, its array is written, the counter
+    becomes even again; M and the arms are versioned separately, so a model
+    update never touches arms_seq. Readers score straight from the shared
+    views (no per-process copy of M or the arms) and retry if either counter
+    was odd or changed while they computed.
+    """
+
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        header = np.ndarray((_HEADER,), dtype=np.int64, buffer=shm.buf)
+        self._seq = header[0:1]
+        self._arms_seq = header[1:2]
+        d_g, d_a, n_arms = (int(x) for x in header[2:5])
+        self.shape = (d_g, d_a, n_arms)
+
+        offset = _HEADER * 8
+        self._M = np.ndarray((d_g, d_a), dtype=np.float64, buffer=shm.buf, offset=offset)
+        offset += d_g * d_a * 8
+        self._arms = np.ndarray((n_arms, d_a), dtype=np.float64, buffer=shm.buf, offset=offset)
+
+    @classmethod
+    def create(cls, M, arm_matrix):
+        d_g, d_a = M.shape
+        n_arms = len(arm_matrix)
+        size = (_HEADER + d_g * d_a + n_arms * d_a) * 8
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        np.ndarray((_HEADER,), dtype=np.int64, buffer=shm.buf)[:] = (0, 0, d_g, d_a, n_arms)
+
+        weights = cls(shm, owner=True)
+        weights.write(M, arm_matrix)
+        return weights
+
+    @classmethod
+    def attach(cls, name):
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def version(self):
+        return int(self._seq[0])
+
+    @property
+    def arms_version(self):
+        return int(self._arms_seq[0])
+
+    def write(self, M, arm_matrix=None):
+        """Writer only. Publishes M (and optionally a same-shape arm matrix)."""
+        self._seq[0] += 1                 # odd → write in progress
+        self._M[:] = M
+        self._seq[0] += 1                 # even → consistent
+        if arm_matrix is not None:
+            self._arms_seq[0] += 1
+            self._arms[:] = arm_matrix
+            self._arms_seq[0] += 1
+
+    def score(self, G):
+        """
+        (G @ M @ arms.T, arms_version) computed on the shared views; retried
+        until no write overlapped the computation.
+        """
+        while True:
+            seq, arms_seq = int(self._seq[0]), int(self._arms_seq[0])
+            if (seq | arms_seq) & 1:
+                continue
+            scores = (G @ self._M) @ self._arms.T
+            if int(self._seq[0]) == seq and int(self._arms_seq[0]) == arms_seq:
+                return scores, arms_seq
+
+    def close(self):
+        # drop the views before closing the mapping
+        self._seq = self._arms_seq = self._M = self._arms = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _score_worker(shm_name, requests, results):
+    weights = SharedBilinearWeights.attach(shm_name)
+    try:
+        while True:
+            item = requests.get()
+            if item is None:
+                return
+            req_id, G = item
+            try:
+                scores, arms_version = weights.score(G)
+                results.put((req_id, np.argmax(scores, axis=-1), arms_version, None))
+            except Exception as e:
+                # report back instead of dying: the caller's future must resolve
+                results.put((req_id, None, None, e))
+    finally:
+        weights.close()
+
+
+class SharedScoringPool:
+    """
+    Scores requests in n_workers processes against one shared copy of a
+    plain bilinear model (score = G @ M @ A.T): LinearModel,
+    ResidualLinearModel or the BaseModel in base_model_ver1. LinUCB and
+    Thompson sampling are rejected: their scores add an exploration bonus or
+    a posterior draw that greedy G @ M @ A.T in the workers would drop.
+
+    Exposes the ContextualBandit surface BanditServer uses
+    (infer_batch_with_context / give_rewards), so it can be passed as the
+    server's bandit_model. This process stays the single writer: rewards
+    update bandit.model here and the new M is published to the readers.
+    Weights are never pickled and never copied per process.
+
+    When the bandit's arm set changes (set_arms / ReloadableArms), the new
+    arm matrix is published before the next batch is scored; a different
+    arm count reallocates the shared block and restarts the workers on it.
+    """
+
+    def __init__(self, bandit, n_workers=2, mp_context=None):
+        if isinstance(bandit.model, BilinearBayesModel) or not hasattr(bandit.model, "M"):
+            raise TypeError("SharedScoringPool needs a plain bilinear model "
+                            f"(score = G @ M @ A), got {type(bandit.model).__name__}")
+
+        self.bandit = bandit
+        self.n_workers = n_workers
+        self._ctx = mp_context or mp.get_context()
+        self._requests = self._ctx.Queue()
+        self._results = self._ctx.Queue()
+
+        self._inferencer = bandit.inferencer
+        self.weights = SharedBilinearWeights.create(
+            np.asarray(bandit.model.M, dtype=np.float64), self._inferencer.arm_matrix)
+        self._workers = []
+        self._start_workers()
+
+        self._ids = itertools.count()
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._publish_lock = threading.RLock()
+        self._collector = threading.Thread(target=self._collect, daemon=True)
+        self._collector.start()
+
+    def _start_workers(self):
+        self._workers = [
+            self._ctx.Process(target=_score_worker,
+                              args=(self.weights.name, self._requests, self._results),
+                              daemon=True)
+            for _ in range(self.n_workers)
+        ]
+        for p in self._workers:
+            p.start()
+
+    def _stop_workers(self):
+        for _ in self._workers:
+            self._requests.put(None)
+        for p in self._workers:
+            p.join()
+        self._workers = []
+
+    def _collect(self):
+        while True:
+            item = self._results.get()
+            if item is None:
+                return
+            req_id, rows, arms_version, error = item
+            with self._lock:
+                fut = self._futures.pop(req_id, None)
+            if fut is None:
+                continue
+            if error is not None:
+                fut.set_exception(error)
+            else:
+                fut.set_result((rows, arms_version))
+
+    def _submit(self, G):
+        fut = Future()
+        req_id = next(self._ids)
+        with self._lock:
+            self._futures[req_id] = fut
+        self._requests.put((req_id, G))
+        return fut
+
+    def select_rows(self, Gs):
+        """(B, d_g) → (B,) best arm rows; the batch is split across the workers."""
+        return self._select(Gs)[1]
+
+    def _select(self, Gs):
+        """select_rows plus the inferencer whose arm_ids the rows index."""
+        Gs = np.asarray(Gs, dtype=np.float64)
+        with self._publish_lock:
+            if self.bandit.inferencer is not self._inferencer:
+                self.publish()
+            inferencer = self._inferencer
+            chunks = np.array_split(Gs, min(len(self._workers), len(Gs)))
+            futures = [self._submit(c) for c in chunks if len(c)]
+            results = [f.result() for f in futures]
+            if any(v != self.weights.arms_version for _, v in results):
+                raise RuntimeError("shared arm matrix changed while scoring")
+            return inferencer, np.concatenate([rows for rows, _ in results])
+
+    def publish(self):
+        """
+        Push the current model and arm matrix to the readers. A changed arm
+        count (or d_a) reallocates the shared block and restarts the workers.
+        """
+        with self._publish_lock:
+            inferencer = self.bandit.inferencer
+            M = np.asarray(self.bandit.model.M, dtype=np.float64)
+            arm_matrix = inferencer.arm_matrix if inferencer is not self._inferencer else None
+
+            d_g, d_a, n_arms = self.weights.shape
+            if arm_matrix is not None and (M.shape, arm_matrix.shape) != ((d_g, d_a), (n_arms, d_a)):
+                self._stop_workers()
+                self.weights.close()
+                self.weights = SharedBilinearWeights.create(M, arm_matrix)
+                self._start_workers()
+            else:
+                self.weights.write(M, arm_matrix)
+            self._inferencer = inferencer
+
+    # ------------------------------------------------------------------
+    # ContextualBandit surface used by BanditServer
+    # ------------------------------------------------------------------
+    def infer_batch_with_context(self, Gs):
+        Gs = np.asarray(Gs, dtype=float)
+        d_g = self.weights.shape[0]
+        if Gs.ndim != 2 or Gs.shape[1] != d_g:
+            raise ValueError(f"expected contexts of shape (B, {d_g}), got {Gs.shape}")
+        inferencer, rows = self._select(Gs)
+        results = []
+        for G, row in zip(Gs, rows):
+            arm_id, p = self.bandit._explore(inferencer.arm_ids[int(row)], inferencer, G)
+            idx = self.bandit.buffer.log_action(G, arm_id, inferencer.arms[arm_id], propensity=p)
+            results.append((arm_id, idx))
+        return results
+
+    def infer_with_context(self, G):
+        return self.infer_batch_with_context([G])[0]
+
+    @property
+    def buffer(self):
+        return self.bandit.buffer
+
+    def give_rewards(self, rewards):
+        self.bandit.give_rewards(rewards)
+        self.publish()
+
+    def give_reward(self, entry_idx, reward):
+        self.give_rewards([(entry_idx, reward)])
+
+    def close(self):
+        self._stop_workers()
+        self._results.put(None)
+        self._collector.join()
+        self.weights.close()
@@ -0,0 +1,261 @@
+# bandit/server/socket_endpoint.py
+
+import json
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from bandit.server.bandit_server import check_message
+
+# frame: [u32 length][u8 kind][payload]
+#   kind J  payload = UTF-8 JSON message (same dicts as BanditServer's in_q)
+#   kind B  payload = [u8 len(request_id)][request_id][float32 * d]  (context)
+_FRAME = struct.Struct("!IB")
+_JSON = ord("J")
+_BINARY = ord("B")
+
+
+def _recv_exact(sock, n):
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            return None
+        buf.extend(chunk)
+    return bytes(buf)
+
+
+def read_frame(sock):
+    """Returns (kind, payload) or None on EOF."""
+    header = _recv_exact(sock, _FRAME.size)
+    if header is None:
+        return None
+    length, kind = _FRAME.unpack(header)
+    payload = _recv_exact(sock, length)
+    if payload is None:
+        return None
+    return kind, payload
+
+
+def encode_json(msg):
+    payload = json.dumps(msg).encode("utf-8")
+    return _FRAME.pack(len(payload), _JSON) + payload
+
+
+def encode_context(request_id, context):
+    rid = request_id.encode("utf-8")
+    vec = np.asarray(context, dtype="<f4").tobytes()
+    payload = bytes([len(rid)]) + rid + vec
+    return _FRAME.pack(len(payload), _BINARY) + payload
+
+
+def decode_frame(kind, payload):
+    """Frame → BanditServer message dict; ValueError if it is not a valid message."""
+    if kind == _JSON:
+        msg = json.loads(payload)               # JSONDecodeError is a ValueError
+        problem = check_message(msg)
+        if problem is not None:
+            raise ValueError(problem)
+        if msg["type"] == "context":
+            try:
+                msg["context"] = np.asarray(msg["context"], dtype=float)
+            except (TypeError, ValueError):
+                raise ValueError("context must be a list of numbers") from None
+            if msg["context"].ndim != 1:
+                raise ValueError("context must be a flat list of numbers")
+        return msg
+    if kind == _BINARY:
+        if not payload:
+            raise ValueError("empty context frame")
+        n = payload[0]
+        request_id = payload[1:1 + n].decode("utf-8")
+        context = np.frombuffer(payload, dtype="<f4", offset=1 + n).astype(float)
+        return {"type": "context", "request_id": request_id, "context": context}
+    raise ValueError(f"unknown frame kind {kind!r}")
+
+
+def _request_id(frame):
+    """Best-effort request_id of an undecodable JSON frame, so the client can match the error."""
+    try:
+        msg = json.loads(frame[1])
+        request_id = msg.get("request_id") if isinstance(msg, dict) else None
+        return request_id if isinstance(request_id, (str, int)) else None
+    except ValueError:
+        return None
+
+
+class _ConnectionHandler(socketserver.BaseRequestHandler):
+    """One persistent connection; requests may be pipelined."""
+
+    def handle(self):
+        endpoint = self.server.endpoint
+        lock = threading.Lock()          # replies come from the router thread
+        conn = (self.request, lock)
+
+        try:
+            while True:
+                frame = read_frame(self.request)
+                if frame is None:
+                    break
+                try:
+                    msg = decode_frame(*frame)
+                except ValueError as e:
+                    endpoint._send(conn, {"type": "error", "request_id": _request_id(frame),
+                                          "detail": str(e)})
+                    continue
+
+                if msg.get("type") == "context":
+                    msg["request_id"] = msg.get("request_id") or uuid.uuid4().hex
+                    endpoint._routes[msg["request_id"]] = conn
+                msg["enqueued_at"] = time.monotonic()
+                endpoint.server.in_q.put(msg)
+        finally:
+            endpoint._drop(conn)
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class BanditSocketEndpoint:
+    """
+    Local socket front end for a running BanditServer.
+
+    address: a filesystem path (Unix domain socket) or a (host, port) tuple
+             (TCP; bind to localhost).
+
+    Each connection is kept open and may pipeline any number of requests.
+    Incoming messages go onto the server's in_q, so messages from all
+    connections share BanditServer's micro-batches. infer_result messages are
+    read from the server's out_q (the endpoint owns it) and routed back to
+    the connection that sent the context, by request_id; replies can
+    therefore arrive out of order. Rewards are fire-and-forget.
+
+    Frames that are not valid messages (unknown type, missing context or
+    reward) never reach the server: the sender gets
+    {"type": "error", "request_id", "detail"} instead.
+
+    Contexts can be sent as JSON or as a compact float32 binary frame; see
+    BanditSocketClient.
+    """
+
+    def __init__(self, server, address):
+        self.server = server
+        self.address = address
+        self._routes = {}                # request_id → (socket, send lock)
+
+        if isinstance(address, (str, bytes)):
+            self._srv = _UnixServer(address, _ConnectionHandler)
+        else:
+            self._srv = _TCPServer(tuple(address), _ConnectionHandler)
+        self._srv.endpoint = self
+
+        self._running = False
+
+    def start(self):
+        self._running = True
+        self._accept_thread = threading.Thread(target=self._srv.serve_forever, daemon=True)
+        self._accept_thread.start()
+        self._router_thread = threading.Thread(target=self._route_results, daemon=True)
+        self._router_thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        self._srv.shutdown()
+        self._srv.server_close()
+        self._router_thread.join()
+
+    def _route_results(self):
+        while self._running:
+            try:
+                msg = self.server.out_q.get(timeout=0.05)
+            except queue.Empty:
+                continue
+            conn = self._routes.pop(msg.get("request_id"), None)
+            if conn is not None:
+                self._send(conn, msg)
+
+    def _send(self, conn, msg):
+        sock, lock = conn
+        try:
+            with lock:
+                sock.sendall(encode_json(msg))
+        except OSError:
+            pass                          # client went away; its replies are dropped
+
+    def _drop(self, conn):
+        for request_id in [rid for rid, c in list(self._routes.items()) if c is conn]:
+            self._routes.pop(request_id, None)
+
+
+class BanditSocketClient:
+    """
+    Blocking client for BanditSocketEndpoint.
+
+        client = BanditSocketClient("/tmp/bandit.sock")
+        result = client.infer(G)                         # one round trip
+        client.reward(result["request_id"], 1.0)
+
+        ids = [client.send_context(G) for G in Gs]       # pipelined
+        results = client.collect(ids)
+    """
+
+    def __init__(self, address, binary=True):
+        family = socket.AF_UNIX if isinstance(address, (str, bytes)) else socket.AF_INET
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        self.sock.connect(address)
+        self.binary = binary
+        self._received = {}
+
+    def send_context(self, context, request_id=None):
+        request_id = request_id or uuid.uuid4().hex
+        if self.binary:
+            frame = encode_context(request_id, context)
+        else:
+            frame = encode_json({"type": "context", "request_id": request_id,
+                                 "context": np.asarray(context, dtype=float).tolist()})
+        self.sock.sendall(frame)
+        return request_id
+
+    def reward(self, request_id, reward):
+        self.sock.sendall(encode_json({"type": "reward", "request_id": request_id,
+                                       "reward": float(reward)}))
+
+    def recv(self):
+        frame = read_frame(self.sock)
+        if frame is None:
+            raise ConnectionError("bandit endpoint closed the connection")
+        return json.loads(frame[1])
+
+    def collect(self, request_ids):
+        """Wait for the replies to request_ids (any arrival order); returned in request order."""
+        pending = set(request_ids) - set(self._received)
+        while pending:
+            msg = self.recv()
+            self._received[msg.get("request_id")] = msg
+            pending.discard(msg.get("request_id"))
+        return [self._received.pop(rid) for rid in request_ids]
+
+    def infer(self, context, request_id=None):
+        return self.collect([self.send_context(context, request_id)])[0]
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,151 @@
+# bandit/trainer/background_trainer.py
+
+import copy
+import queue
+import threading
+
+import numpy as np
+
+from bandit.core import instrumentation as instr
+
+
+class BackgroundTrainer:
+    """
+    Moves model.update off the serving thread.
+
+    Two copies of the parameters:
+        shadow     private to the worker thread; every update writes here
+        published  what bandit.model / bandit.inferencer.model point to;
+                   never written after it is published
+
+    After the worker drains the pending updates it publishes a snapshot of the
+    shadow (copy.deepcopy: models copy their parameters only — NeuralModel
+    drops its arm tensor cache, ResidualLinearModel keeps the shared base;
+    a Thompson sampling rng is replaced by a fresh one spawned from the
+    trainer's SeedSequence) by swapping in a new inferencer built with
+    with_model(snapshot), under bandit.lock so it cannot interleave with
+    set_arms. A reader that grabbed the old inferencer keeps scoring on a
+    consistent old snapshot; new calls see the new one. No locks on the
+    inference path.
+
+    Joint (time, dong) updates go through the same queue: they train a
+    shadow JointInferencer whose time side is the shadow model, and the
+    published bandit.joint is rebuilt from snapshots.
+
+        trainer = BackgroundTrainer(bandit).start()
+        bandit.trainer = trainer            # or bandit.enable_background_training()
+        ...
+        trainer.flush()                      # wait until submitted updates are published
+        trainer.stop()
+    """
+
+    def __init__(self, bandit):
+        self.bandit = bandit
+        # snapshots get their own random stream (Thompson sampling draws), spawned from here
+        rng = getattr(bandit.model, "rng", None)
+        entropy = int(rng.integers(2 ** 63)) if isinstance(rng, np.random.Generator) else None
+        self._seeds = np.random.SeedSequence(entropy)
+        self.version = 0
+        self.resync()
+
+        self._q = queue.Queue()
+        self._thread = None
+        self._stop = object()
+
+        self.metrics = {"submitted": 0, "updates": 0, "published": 0, "errors": 0}
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, flush=True):
+        if self._thread is None:
+            return
+        if flush:
+            self.flush()
+        self._q.put(self._stop)
+        self._thread.join()
+        self._thread = None
+
+    def submit(self, samples, joint_samples=None):
+        """Queue one update (plain and joint (time, dong) samples); returns immediately."""
+        self._q.put((samples, joint_samples or []))
+        self.metrics["submitted"] += 1
+
+    def flush(self):
+        """Block until every submitted update has been applied and published."""
+        self._q.join()
+
+    def resync(self):
+        """
+        Re-copy the shadows from the published models (after load_weights or
+        enable_joint). Call after flush().
+        """
+        self.shadow = copy.deepcopy(self.bandit.model)
+        joint = self.bandit.joint
+        self.shadow_joint = None
+        if joint is not None:
+            # the joint time side is the same model object as the shadow, like bandit.model
+            self.shadow_joint = joint.with_models(self.shadow, copy.deepcopy(joint.dong.model),
+                                                  copy.deepcopy(joint.interaction))
+
+    def _run(self):
+        while True:
+            item = self._q.get()
+            instr.gauge("trainer.queue_depth", self._q.qsize())
+            items = [item]
+            while True:                       # coalesce everything already queued
+                try:
+                    items.append(self._q.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = False
+            trained = False
+            for item in items:
+                if item is self._stop:
+                    stop = True
+                    continue
+                samples, joint_samples = item
+                try:
+                    with instr.span("model.update"):
+                        if samples:
+                            self.shadow.update(samples)
+                        if joint_samples:
+                            self.shadow_joint.update(joint_samples)
+                    self.metrics["updates"] += 1
+                    trained = True
+                except Exception as e:
+                    self.metrics["errors"] += 1
+                    print(f"[trainer] update failed: {e}")
+
+            if trained:
+                self._publish()
+            for _ in items:
+                self._q.task_done()
+            if stop:
+                return
+
+    def _snapshot(self, model):
+        snapshot = copy.deepcopy(model)
+        if isinstance(getattr(snapshot, "rng", None), np.random.Generator):
+            # a copied generator would replay the shadow's stream in every snapshot
+            snapshot.rng = np.random.default_rng(self._seeds.spawn(1)[0])
+        return snapshot
+
+    def _publish(self):
+        snapshot = self._snapshot(self.shadow)
+        dong_snapshot = interaction = None
+        if self.shadow_joint is not None:
+            dong_snapshot = self._snapshot(self.shadow_joint.dong.model)
+            interaction = copy.deepcopy(self.shadow_joint.interaction)
+        bandit = self.bandit
+        with bandit.lock:                     # consistent with set_arms / load_weights swaps
+            bandit.inferencer = bandit.inferencer.with_model(snapshot)
+            bandit.model = snapshot
+            if dong_snapshot is not None and bandit.joint is not None:
+                # arm matrices from the live joint: set_arms may have replaced the time arms
+                bandit.joint = bandit.joint.with_models(snapshot, dong_snapshot, interaction)
+        self.version += 1
+        self.metrics["published"] += 1
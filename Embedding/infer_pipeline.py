@@ -3,19 +3,28 @@
 from embedding.model_loader import load_model
 from embedding.embedder import embed_text
 from embedding.text_encoder import profile_to_text
+from embedding.projection import ContextProjection
+
+import numpy as np
 
 # 전역 변수 - 한 번만 로드됨
 tokenizer = None
 model = None
 device = None
+projection = None   # ContextProjection (D → d_g)
+
+CONTEXT_DIM = 16
 
 
-def init_infer_pipeline(model_name="kakaocorp/kanana-nano-2.1b-embedding"):
+def init_infer_pipeline(model_name="kakaocorp/kanana-nano-2.1b-embedding", projection_path=None):
     """
     GUI(Integrated Agent) 시작 시 반드시 한 번 호출됨.
     Kanana 모델을 메모리에 로딩하고 infer mode 준비.
+
+    projection_path: ContextProjection.save()로 저장한 (D, d_g) 투영 행렬.
+                     없으면 첫 임베딩 차원으로 block-mean 투영을 만든다.
     """
-    global tokenizer, model, device
+    global tokenizer, model, device, projection
 
     if tokenizer is None:
         tokenizer, model, device = load_model(model_name)
@@ -24,12 +33,43 @@ def init_infer_pipeline(model_name="kakaocorp/kanana-nano-2.1b-embedding"):
     else:
         print("✓ infer_pipeline already initialized — model reused.")
 
+    if projection_path is not None:
+        projection = ContextProjection.load(projection_path)
+        print(f"✓ context projection loaded ({projection.kind}, "
+              f"{projection.in_dim} → {projection.out_dim}).")
+
+
+def set_projection(proj):
+    global projection
+    projection = proj
 
-def embed_for_agent(user_json_payload: dict):
+
+def get_projection(in_dim):
+    """
+    Current projection. Only when none has been loaded / fitted / set does it
+    fall back to block-mean over all in_dim dims; a projection built for a
+    different embedding size is an error, not something to replace.
+    """
+    global projection
+    if projection is None:
+        projection = ContextProjection.block_mean(in_dim, CONTEXT_DIM)
+    elif projection.in_dim != in_dim:
+        raise ValueError(f"context projection ({projection.kind}) expects {projection.in_dim}-dim "
+                         f"embeddings, got {in_dim}; refit it for this embedding model")
+    return projection
+
+
+def project(vectors):
+    """(D,) or (B, D) raw embeddings → (d_g,) / (B, d_g), one matmul."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return get_projection(vectors.shape[-1]).project(vectors)
+
+
+def embed_for_agent(user_json_payload: dict, project_to_context=True):
     """
     1) JSON user payload → 자연어 텍스트 변환
     2) 텍스트 → embedding 생성
-    3) embedding 벡터 반환
+    3) embedding 벡터 반환 (project_to_context → d_g 차원 global context로 투영)
     """
 
     if tokenizer is None:
@@ -44,4 +84,29 @@ def embed_for_agent(user_json_payload: dict):
     # 2) 텍스트 → embedding
     vector = embed_text(text, tokenizer, model, device)
 
+    if project_to_context:
+        return project(vector)
     return vector
+
+
+def fit_projection(payloads, d_g=CONTEXT_DIM, method="pca", out_path=None):
+    """
+    Offline: embed a corpus of payloads and fit the (D, d_g) projection
+    (method "pca" or "random"). The result becomes the active projection and
+    is saved to out_path if given.
+    """
+    X = embed_batch_for_agent(payloads, project_to_context=False)
+    if method == "pca":
+        proj = ContextProjection.fit_pca(X, d_g)
+    else:
+        proj = ContextProjection.random(X.shape[1], d_g)
+    if out_path is not None:
+        proj.save(out_path)
+    set_projection(proj)
+    return proj
+
+
+def embed_batch_for_agent(payloads, project_to_context=True):
+    """여러 payload → (B, D) 임베딩, 투영은 한 번의 matmul로."""
+    vectors = np.stack([embed_for_agent(p, project_to_context=False) for p in payloads])
+    return project(vectors) if project_to_context else vectors
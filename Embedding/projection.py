@@ -0,0 +1,87 @@
+# embedding/projection.py
+
+import numpy as np
+
+
+class ContextProjection:
+    """
+    Linear map from the full embedding (D dims) to the bandit's global
+    context (d_g dims): one matmul, for a single vector or a batch.
+
+        g = (x - mean) @ W          W: (D, d_g) float32
+
+    Built offline with fit_pca() (or random()), saved with save() and loaded
+    by init_infer_pipeline(projection_path=...). block_mean() reproduces the
+    old block averaging without dropping the trailing D % d_g values and is
+    the fallback when no fitted projection is available.
+    """
+
+    def __init__(self, W, mean=None, kind="custom"):
+        self.W = np.ascontiguousarray(W, dtype=np.float32)
+        self.mean = None if mean is None else np.asarray(mean, dtype=np.float32)
+        self.kind = kind
+
+    @property
+    def in_dim(self):
+        return self.W.shape[0]
+
+    @property
+    def out_dim(self):
+        return self.W.shape[1]
+
+    # ------------------------------------------------------------------
+    # construction
+    # ------------------------------------------------------------------
+    @classmethod
+    def fit_pca(cls, X, d_g=16):
+        """X: (N, D) embeddings from the offline corpus."""
+        X = np.asarray(X, dtype=np.float64)
+        mean = X.mean(axis=0)
+        _, _, Vt = np.linalg.svd(X - mean, full_matrices=False)
+        W = np.zeros((X.shape[1], d_g))
+        k = min(d_g, Vt.shape[0])          # fewer samples than d_g → zero-padded
+        W[:, :k] = Vt[:k].T
+        return cls(W, mean, kind="pca")
+
+    @classmethod
+    def random(cls, D, d_g=16, seed=0):
+        """Gaussian random projection (Johnson–Lindenstrauss), no data needed."""
+        rng = np.random.default_rng(seed)
+        return cls(rng.standard_normal((D, d_g)) / np.sqrt(d_g), kind="random")
+
+    @classmethod
+    def block_mean(cls, D, d_g=16):
+        """Mean of d_g near-equal contiguous blocks covering all D dims."""
+        W = np.zeros((D, d_g))
+        for j, block in enumerate(np.array_split(np.arange(D), d_g)):
+            W[block, j] = 1.0 / len(block)
+        return cls(W, kind="block_mean")
+
+    # ------------------------------------------------------------------
+    # apply
+    # ------------------------------------------------------------------
+    def project(self, X):
+        """(D,) → (d_g,), or (B, D) → (B, d_g); float32."""
+        X = np.asarray(X, dtype=np.float32)
+        if X.shape[-1] != self.in_dim:
+            raise ValueError(f"projection expects {self.in_dim}-dim embeddings, got {X.shape[-1]}")
+        if self.mean is not None:
+            X = X - self.mean
+        return X @ self.W
+
+    __call__ = project
+
+    # ------------------------------------------------------------------
+    # persistence
+    # ------------------------------------------------------------------
+    def save(self, path):
+        arrays = {"W": self.W, "kind": np.array(self.kind)}
+        if self.mean is not None:
+            arrays["mean"] = self.mean
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            mean = data["mean"] if "mean" in data.files else None
+            return cls(data["W"], mean, kind=str(data["kind"]))
@@ -3,10 +3,12 @@
 # 임베더 불러오기
 from embedding.infer_pipeline import embed_for_agent
 from embedding.infer_pipeline import init_infer_pipeline
+from embedding.infer_pipeline import project
 import threading
 import time
 import queue
-import numpy as np
+
+from bandit.core import instrumentation as instr
 
 class IntegratedAgent:
     def __init__(self, chat_window, num_users, bandit_in_queue, bandit_out_queue):
@@ -89,14 +91,16 @@ class IntegratedAgent:
             return
 
         try:
-            embedding_vector = embed_for_agent(combined_text)
+            with instr.span("agent.embed_for_agent"):
+                embedding_vector = embed_for_agent(combined_text, project_to_context=False)
 
             # ⭐ 핵심: 통합 에이전트 내부 상태에 저장
             self.current_context_embedding = embedding_vector  
 
             self.chat.display("Agent: 임베딩 완료!")
             self.chat.display(f"임베딩 벡터 차원: {len(embedding_vector)}")
-            embedding_vector_16 = self.reduce_to_16dims(embedding_vector)
+            with instr.span("agent.reduce_to_16dims"):
+                embedding_vector_16 = self.reduce_to_16dims(embedding_vector)
 
         except Exception as e:
             self.chat.display("❌ 임베딩 중 오류 발생!")
@@ -108,7 +112,8 @@ class IntegratedAgent:
         # self.finish_bandit_dummy()
         self.bandit_in_q.put({
             "type": "context",
-            "context": embedding_vector_16
+            "context": embedding_vector_16,
+            "enqueued_at": time.monotonic()
         })
 
 
@@ -121,12 +126,5 @@ class IntegratedAgent:
 
         self.chat.display("Agent: 추천 결과 → '월요일 오후 3시'")
     def reduce_to_16dims(self, vec):
-        
-        vec = np.array(vec)
-        block = len(vec) // 16
-        small = []
-        for i in range(16):
-            start = i * block
-            end = (i+1) * block
-            small.append(np.mean(vec[start:end]))
-        return small
\ No newline at end of file
+        """Full embedding → 16-dim global context (fitted projection, one matmul)."""
+        return project(vec)